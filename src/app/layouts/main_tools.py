@@ -1,4 +1,5 @@
-from PyQt6.QtWidgets import QVBoxLayout, QHBoxLayout, QSpinBox, QPushButton, QSpacerItem, QSizePolicy, QSlider, QFrame
+from PyQt6.QtWidgets import QVBoxLayout, QHBoxLayout, QSpinBox, QPushButton, QSpacerItem, QSizePolicy, QSlider, QFrame, \
+    QCheckBox, QComboBox
 
 from src.app.widgets.glitch_label import *
 from src.utils.gui_helpers import *
@@ -44,6 +45,53 @@ class MainToolsLayout(QVBoxLayout):
 
         self.addLayout(self.layout_training_params)
 
+        self.layout_epoch_params = QHBoxLayout()
+
+        self.label_epochs = QLabel("Epochs:")
+        set_widget_style(self.label_epochs, SIZE_FONT_H3, int(SIZE_FONT_H3 * 1.5), Qt.AlignmentFlag.AlignLeft)
+        self.layout_epoch_params.addWidget(self.label_epochs)
+
+        self.spinbox_epochs = QSpinBox()
+        self.spinbox_epochs.setRange(1, 100)
+        self.spinbox_epochs.setToolTip("More than one epoch validates on the last 10% of the records and stops early")
+        self.layout_epoch_params.addWidget(self.spinbox_epochs)
+
+        self.checkbox_streaming = QCheckBox("Stream")
+        self.checkbox_streaming.setToolTip("Train while the file is being read, without loading it first")
+        set_checkbox_style(self.checkbox_streaming, SIZE_FONT_H3)
+        self.layout_epoch_params.addWidget(self.checkbox_streaming)
+
+        self.checkbox_profiling = QCheckBox("Profile")
+        self.checkbox_profiling.setToolTip("Time every phase of train and test runs and show the breakdown afterwards")
+        set_checkbox_style(self.checkbox_profiling, SIZE_FONT_H3)
+        self.layout_epoch_params.addWidget(self.checkbox_profiling)
+
+        self.layout_epoch_params.addStretch()
+        self.addLayout(self.layout_epoch_params)
+
+        # --- Model section
+
+        self.layout_model_params = QHBoxLayout()
+
+        self.label_model = QLabel("Model:")
+        set_widget_style(self.label_model, SIZE_FONT_H3, int(SIZE_FONT_H3 * 1.5), Qt.AlignmentFlag.AlignLeft)
+        self.layout_model_params.addWidget(self.label_model)
+
+        self.button_save_model = QPushButton("Save")
+        self.button_save_model.clicked.connect(callbacks["on_save_model"])
+        self.layout_model_params.addWidget(self.button_save_model)
+
+        self.button_load_model = QPushButton("Load")
+        self.button_load_model.clicked.connect(callbacks["on_load_model"])
+        self.layout_model_params.addWidget(self.button_load_model)
+
+        self.button_export_metrics = QPushButton("Metrics")
+        self.button_export_metrics.setToolTip("Export the training metrics as CSV or JSON")
+        self.button_export_metrics.clicked.connect(callbacks["on_export_metrics"])
+        self.layout_model_params.addWidget(self.button_export_metrics)
+
+        self.addLayout(self.layout_model_params)
+
         self.addSpacing(20)
 
         # --- Test dataset section
@@ -80,7 +128,40 @@ class MainToolsLayout(QVBoxLayout):
         self.slider_selection_range.setSingleStep(1)
         self.slider_selection_range.setTickInterval(1)
         self.slider_selection_range.valueChanged.connect(lambda value: callbacks["on_record_update"](value - 1))
-        self.addWidget(self.slider_selection_range)
+
+        # next to the slider: jumps between the misclassified records, of all classes or of the chosen one
+        self.layout_record_selection = QHBoxLayout()
+        self.layout_record_selection.addWidget(self.slider_selection_range, 1)
+
+        self.combobox_error_class = QComboBox()
+        self.combobox_error_class.setVisible(False)
+        self.combobox_error_class.setToolTip("Class of the errors to jump between")
+        self.combobox_error_class.addItem("All errors", None)
+        for digit in range(10):
+            self.combobox_error_class.addItem(f"Errors of {digit}", digit)
+        self.combobox_error_class.currentIndexChanged.connect(lambda _: callbacks["on_error_class_changed"]())
+        self.layout_record_selection.addWidget(self.combobox_error_class)
+
+        self.button_previous_error = QPushButton("<")
+        self.button_previous_error.setVisible(False)
+        self.button_previous_error.setFixedWidth(30)
+        self.button_previous_error.setToolTip("Previous error")
+        self.button_previous_error.clicked.connect(lambda: callbacks["on_select_error"](-1))
+        self.layout_record_selection.addWidget(self.button_previous_error)
+
+        self.button_next_error = QPushButton(">")
+        self.button_next_error.setVisible(False)
+        self.button_next_error.setFixedWidth(30)
+        self.button_next_error.setToolTip("Next error")
+        self.button_next_error.clicked.connect(lambda: callbacks["on_select_error"](1))
+        self.layout_record_selection.addWidget(self.button_next_error)
+
+        self.label_error_position = QLabel()
+        self.label_error_position.setVisible(False)
+        set_widget_style(self.label_error_position, SIZE_FONT_H3, 0, Qt.AlignmentFlag.AlignRight)
+        self.layout_record_selection.addWidget(self.label_error_position)
+
+        self.addLayout(self.layout_record_selection)
 
         self.label_test_info = QLabel()
         set_widget_style(self.label_test_info, SIZE_FONT_H3, int(SIZE_FONT_H3 * 1.5), Qt.AlignmentFlag.AlignCenter)
@@ -89,6 +170,8 @@ class MainToolsLayout(QVBoxLayout):
 
         self.label_accuracy = QLabel()
         set_widget_style(self.label_accuracy, SIZE_FONT_ACCURACY, 0, Qt.AlignmentFlag.AlignCenter)
+        # keeps the room of the accuracy line before there is a result, the window is sized with it
+        self.label_accuracy.setMinimumHeight(self.label_accuracy.fontMetrics().height())
         self.addWidget(self.label_accuracy)
 
         self.addStretch()
@@ -109,12 +192,38 @@ class MainToolsLayout(QVBoxLayout):
     def get_max_records_for_training(self):
         return self.spinbox_max_records_training.value()
 
+    def get_epochs(self):
+        return self.spinbox_epochs.value()
+
     def get_max_records_for_test(self):
         return self.spinbox_max_records_test.value()
 
+    def is_streaming_enabled(self):
+        return self.checkbox_streaming.isChecked()
+
+    def is_profiling_enabled(self):
+        return self.checkbox_profiling.isChecked()
+
+    def get_error_class(self):
+        # the chosen digit, None for the errors of all classes
+        return self.combobox_error_class.currentData()
+
+    def get_selected_record(self):
+        return self.slider_selection_range.value() - 1
+
+    def select_record(self, index: int):
+        self.slider_selection_range.setValue(index + 1)
+        pass
+
+    def update_error_position(self, text: str):
+        self.label_error_position.setText(text)
+        pass
+
     def set_buttons_enabled(self, enabled: bool):
-        self.button_select_training_dataset.setEnabled(enabled)
-        self.button_select_test_dataset.setEnabled(enabled)
+        # datasets can still be selected while a job runs, they are queued
+        self.button_save_model.setEnabled(enabled)
+        self.button_load_model.setEnabled(enabled)
+        self.button_export_metrics.setEnabled(enabled)
         pass
 
     def update_test_info(self, text: str, accuracy: str):
@@ -122,6 +231,13 @@ class MainToolsLayout(QVBoxLayout):
         self.label_accuracy.setText(accuracy)
         pass
 
+    def set_test_sections_visible(self, visible: bool):
+        # the test dataset and record selection rows, hidden until there is a model to test
+        self.test_dataset_header.setVisible(visible)
+        set_layout_visible(self.layout_test_params, visible)
+        set_layout_visible(self.layout_record_selection, visible)
+        pass
+
     def show_gui_for_test_dataset(self):
         if not self.test_dataset_header.isVisible():
             self.test_dataset_header.setVisible(True)
@@ -130,6 +246,6 @@ class MainToolsLayout(QVBoxLayout):
 
     def show_gui_for_statistics(self, dataset_size: int):
         self.slider_selection_range.setRange(1, dataset_size)
-        self.slider_selection_range.setVisible(True)
+        set_layout_visible(self.layout_record_selection, True)
         self.slider_selection_range.valueChanged.emit(self.slider_selection_range.value())
         pass
\ No newline at end of file
@@ -1,36 +1,11 @@
 from PyQt6.QtCore import QSize
-from PyQt6.QtGui import QPixmap, QPainter, QPen, QColor
+from PyQt6.QtGui import QPixmap
 from PyQt6.QtWidgets import QVBoxLayout, QLabel
 
 from src.utils.gui_helpers import *
 from src.utils.utils import *
 
 
-def draw_grid_for_pixmap(pixmap: QPixmap, cell_size: int = 10) -> QPixmap:
-    result = QPixmap(pixmap.size())
-    result.fill(Qt.GlobalColor.white)
-
-    painter = QPainter(result)
-    painter.drawPixmap(0, 0, pixmap)
-
-    pen = QPen(QColor(0, 0, 0, 128))
-    pen.setStyle(Qt.PenStyle.DotLine)
-    pen.setWidth(1)
-    painter.setPen(pen)
-
-    width = pixmap.width()
-    height = pixmap.height()
-
-    for y in range(0, height, cell_size):
-        painter.drawLine(0, y, width, y)
-
-    for x in range(0, width, cell_size):
-        painter.drawLine(x, 0, x, height)
-
-    painter.end()
-    return result
-
-
 class RecordInfoLayout(QVBoxLayout):
     def __init__(self, callbacks: dict = None):
         super(RecordInfoLayout, self).__init__()
@@ -56,12 +31,14 @@ class RecordInfoLayout(QVBoxLayout):
 
     # --- Main GUI methods
 
-    def update_record_info(self, text: str):
+    def update_record_info(self, text: str, top_answers: list = None):
         self.label_record_info.setText(text)
+        # the best answers with their outputs, on hover
+        self.label_record_info.setToolTip(
+            "\n".join(f"{digit}: {score:.3f}" for digit, score in top_answers) if top_answers else "")
         pass
 
     def set_pixmap(self, pixmap: QPixmap):
-        pixmap = pixmap.scaled(IMAGE_WITH_DIGIT_SIZE, IMAGE_WITH_DIGIT_SIZE, Qt.AspectRatioMode.KeepAspectRatio)
-        pixmap = draw_grid_for_pixmap(pixmap, int(IMAGE_WITH_DIGIT_SIZE / 4))
+        # the pixmap comes already scaled and with the grid from RecordRenderer
         self.image_with_digit.setPixmap(pixmap)
         pass
\ No newline at end of file
@@ -1,19 +1,28 @@
-from PyQt6.QtCore import QSize, QDir, QTimer, pyqtSignal
+from pathlib import Path
+
+from PyQt6.QtCore import QSize, QDir, pyqtSignal
+from PyQt6.QtGui import QPixmap
 from PyQt6.QtWidgets import QMainWindow, QVBoxLayout, QHBoxLayout, QFileDialog, \
-    QMessageBox
+    QMessageBox, QPushButton
 
 from concurrent.futures import ThreadPoolExecutor
 from src.utils.utils import *
 from src.utils.gui_helpers import *
+from src.core.jobs import JobManager, JobControl, Job, DONE, FAILED, PAUSED
 from src.core.mnist_reader import NetMode, MnistReader
+from src.utils.profiler import Profiler
 from src.app.layouts.main_tools import MainToolsLayout
 from src.app.layouts.record_info import RecordInfoLayout
+from src.app.record_renderer import RecordRenderer
+from src.app.widgets.metrics_chart import QMetricsChart, CHART_POINTS
 
 
 # Subclass for the main app window
 # noinspection PyUnresolvedReferences
 class MainWindow(QMainWindow):
-    on_update_progress = pyqtSignal(int)
+    on_update_progress = pyqtSignal()
+    on_update_jobs = pyqtSignal()
+    on_job_finished = pyqtSignal(object, object)
 
     def __init__(self, executor: ThreadPoolExecutor):
         super(MainWindow, self).__init__()
@@ -21,22 +30,45 @@ class MainWindow(QMainWindow):
         callbacks = {
             "on_select_training_dataset": lambda: self.open_file_dialog(self.start_train),
             "on_select_test_dataset": lambda: self.open_file_dialog(self.start_query),
+            "on_save_model": self.save_model,
+            "on_load_model": self.load_model,
+            "on_export_metrics": self.export_metrics,
             "on_record_update": self.update_record_info,
-            "on_progress_update": lambda count: self.update_progress_bar(count)
+            "on_select_error": self.select_error,
+            "on_error_class_changed": lambda: self.update_error_position(self.main_tools_layout.get_selected_record()),
+            "on_progress_update": self.update_progress_bar
         }
 
         self.setWindowTitle("Simple Neural Network for MNIST")
         self.last_dir = QDir.currentPath() + "/mnist_dataset"
         self.executor = executor
         self.reader = MnistReader()
+
+        # the model file last saved or loaded, a finished train run writes its weights back to it
+        self.model_path = None
+        self.renderer = RecordRenderer(self.reader.get_image_batch, IMAGE_WITH_DIGIT_SIZE, int(IMAGE_WITH_DIGIT_SIZE / 4))
         self.on_update_progress.connect(callbacks["on_progress_update"])
 
+        # train and test runs are queued and run one after another, the signals bring their state to the GUI thread
+        self.jobs = JobManager(executor, lambda manager: self.on_update_jobs.emit())
+        self.queued_jobs = 0
+        self.on_update_jobs.connect(self.update_job_status)
+        self.on_job_finished.connect(lambda job, handler: handler(job))
+
+        # the latest progress snapshot of the worker thread, at most one signal is queued for it
+        self.progress_snapshot = None
+        self.progress_pending = False
+
         # === Left layout! ===
         self.main_tools_layout = MainToolsLayout(callbacks)
 
         # === Right layout ===
         self.record_info_layout = RecordInfoLayout(callbacks)
 
+        # === Training chart ===
+
+        self.metrics_chart = QMetricsChart()
+
         # === Progress bar ===
 
         self.progressBar = QProgressBar()
@@ -44,6 +76,22 @@ class MainWindow(QMainWindow):
         self.progressBar.setFormat("Progress: %p%")
         set_progress_bar_style(self.progressBar, SIZE_FONT_PROGRESS, int(SIZE_FONT_PROGRESS * 1.75), Qt.AlignmentFlag.AlignCenter)
 
+        self.button_pause = QPushButton("Pause")
+        self.button_pause.setFixedHeight(int(SIZE_FONT_PROGRESS * 1.75))
+        self.button_pause.setEnabled(False)
+        self.button_pause.clicked.connect(self.toggle_pause)
+
+        self.button_cancel = QPushButton("Cancel")
+        self.button_cancel.setFixedHeight(int(SIZE_FONT_PROGRESS * 1.75))
+        self.button_cancel.setEnabled(False)
+        self.button_cancel.clicked.connect(lambda: self.jobs.cancel())
+
+        self.progress_layout = QHBoxLayout()
+        self.progress_layout.setSpacing(0)
+        self.progress_layout.addWidget(self.progressBar)
+        self.progress_layout.addWidget(self.button_pause)
+        self.progress_layout.addWidget(self.button_cancel)
+
         # === Full-space layout ===
 
         self.full_space_layout = QHBoxLayout()
@@ -56,31 +104,72 @@ class MainWindow(QMainWindow):
         self.main_layout = QVBoxLayout()
         self.main_layout.setContentsMargins(0, 0, 0, 0)
         self.main_layout.addLayout(self.full_space_layout)
-        self.main_layout.addWidget(self.progressBar)
+        self.main_layout.addWidget(self.metrics_chart)
+        self.main_layout.addLayout(self.progress_layout)
 
         container = QWidget()
         container.setLayout(self.main_layout)
         self.setCentralWidget(container)
-        self.setFixedSize(QSize(960, 540))
+
+        # one window size for the whole session, measured with the test sections of the left column shown
+        self.main_tools_layout.set_test_sections_visible(True)
+        window_height = max(WINDOW_MIN_HEIGHT, self.main_layout.minimumSize().height())
+        self.main_tools_layout.set_test_sections_visible(False)
+        self.setFixedSize(QSize(WINDOW_WIDTH, window_height))
         self.setStyleSheet("""
             QMainWindow {
+                background-color: #010b14;
                 background-image: url("resources/back.jpg");
                 background-repeat: no-repeat;
-                background-position: center;
+                background-position: top center;
                 background-attachment: fixed;
                 background-origin: content;
             }
         """)
 
+    def closeEvent(self, event):
+        # stop the running job at its next batch so the application can exit
+        self.jobs.cancel_all()
+        super().closeEvent(event)
+
     # --- Main GUI methods
 
-    def update_progress_bar(self, count: int):
-        self.progressBar.setValue(int(count / self.reader.get_dataset_size() * 100))
+    def post_progress(self, snapshot: dict):
+        # called from the worker thread, snapshots that arrive before the GUI has drawn the last one replace it
+        self.progress_snapshot = snapshot
+        if not self.progress_pending:
+            self.progress_pending = True
+            self.on_update_progress.emit()
+        pass
+
+    def update_progress_bar(self):
+        self.progress_pending = False
+        snapshot = self.progress_snapshot
+        if snapshot is None:
+            return
+
+        text = f"{snapshot['stage']}: %p%  ({snapshot['completed']:,} / {snapshot['total']:,})"
+        if snapshot["samples_per_sec"] > 0:
+            text += f"  {snapshot['samples_per_sec']:,.0f} samples/s"
+        if snapshot["eta_sec"] is not None and snapshot["completed"] < snapshot["total"]:
+            text += f"  ETA {snapshot['eta_sec']:.0f} s"
+        if self.queued_jobs:
+            text += f"  ({self.queued_jobs} queued)"
+
+        self.progressBar.setFormat(text)
+        self.progressBar.setValue(int(snapshot["fraction"] * 100))
+        if self.reader.net_mode == NetMode.TRAIN:
+            self.update_metrics_chart()
+        pass
+
+    def update_metrics_chart(self):
+        self.metrics_chart.set_metrics(self.reader.metrics.downsample(CHART_POINTS),
+                                       self.reader.metrics.get_epoch_metrics())
         pass
 
     def update_test_info(self):
         self.main_tools_layout.update_test_info(
-            f"Overall net accuracy is:",
+            f"Accuracy of model version {self.reader.get_model_version()}:",
             f"{self.reader.get_accuracy():.2f}%"
         )
         pass
@@ -88,7 +177,35 @@ class MainWindow(QMainWindow):
     def update_record_info(self, index: int):
         self.set_pixmap(index)
         info_text = self.get_current_record_info(index)
-        self.record_info_layout.update_record_info(info_text)
+        self.record_info_layout.update_record_info(info_text, self.get_top_answers(index))
+        self.update_error_position(index)
+        pass
+
+    def select_error(self, step: int):
+        # jumps to the next (1) or previous (-1) misclassified record of the chosen class
+        evaluation = self.reader.get_evaluation()
+        if evaluation is None:
+            return
+
+        index = evaluation.find_error(self.main_tools_layout.get_selected_record(),
+                                      self.main_tools_layout.get_error_class(), step)
+        if index is not None:
+            self.main_tools_layout.select_record(index)
+        pass
+
+    def update_error_position(self, index: int):
+        evaluation = self.reader.get_evaluation()
+        if evaluation is None or index >= len(evaluation):
+            self.main_tools_layout.update_error_position("")
+            return
+
+        error_class = self.main_tools_layout.get_error_class()
+        errors = len(evaluation.get_errors(error_class))
+        rank = evaluation.get_error_rank(index, error_class)
+        if rank is not None:
+            self.main_tools_layout.update_error_position(f"{rank + 1} / {errors}")
+        else:
+            self.main_tools_layout.update_error_position(f"{errors} errors")
         pass
 
     def set_pixmap(self, index: int):
@@ -96,7 +213,12 @@ class MainWindow(QMainWindow):
             self.show_error_message(MSG_DATASET_IS_NOT_LOADED)
             return
 
-        pixmap = self.reader.get_plot_as_pixmap(index)
+        try:
+            pixmap = self.renderer.get_pixmap(index)
+        except (IndexError, ValueError) as e:
+            print(f"Record {index} was not rendered: {e}")
+            pixmap = QPixmap()
+
         if pixmap.isNull():
             self.show_error_message(MSG_EMPTY_IMAGE_ARRAY)
             return
@@ -114,11 +236,71 @@ class MainWindow(QMainWindow):
 
         if file_path:
             print(f"Selected file: {file_path}")
-            from pathlib import Path
             self.last_dir = str(Path(file_path).parent)
             callback(file_path)
         pass
 
+    def save_model(self):
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Save model",
+            self.last_dir,
+            "Model files (*.nnm);;All files (*.*)"
+        )
+
+        if not file_path:
+            return
+
+        if not self.reader.save_model(file_path):
+            self.show_error_message(MSG_MODEL_IS_NOT_SAVED)
+            return
+
+        self.set_model_path(file_path)
+        pass
+
+    def load_model(self):
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "Load model",
+            self.last_dir,
+            "Model files (*.nnm);;All files (*.*)"
+        )
+
+        if not file_path:
+            return
+
+        if not self.reader.load_model(file_path):
+            self.show_error_message(MSG_MODEL_IS_NOT_LOADED)
+            return
+
+        self.set_model_path(file_path)
+        self.update_test_info()
+        self.main_tools_layout.show_gui_for_test_dataset()
+        self.show_info_message(MSG_MODEL_LOADED.format(self.reader.get_total_trained()))
+        pass
+
+    def set_model_path(self, file_path: str):
+        # the final weights of further train runs go to the model file, the periodic checkpoints
+        # of a run go to a separate autosave file, so a cancelled run never overwrites the model
+        self.model_path = file_path
+        self.reader.checkpoint_path = file_path + AUTOSAVE_SUFFIX
+        pass
+
+    def export_metrics(self):
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Export metrics",
+            self.last_dir,
+            "CSV files (*.csv);;JSON files (*.json)"
+        )
+
+        if not file_path:
+            return
+
+        if not self.reader.export_metrics(file_path):
+            self.show_error_message(MSG_METRICS_ARE_NOT_EXPORTED)
+        pass
+
     @staticmethod
     def show_error_message(text: str):
         msg = QMessageBox()
@@ -129,75 +311,137 @@ class MainWindow(QMainWindow):
         pass
 
     @staticmethod
-    def show_info_message(text: str):
+    def show_info_message(text: str, details: str = None):
         msg = QMessageBox()
         msg.setIcon(QMessageBox.Icon.Information)
         msg.setWindowTitle("Information")
         msg.setText(text)
+        if details:
+            # tables, keep their columns aligned
+            msg.setDetailedText(details)
+            msg.setStyleSheet("QTextEdit { font-family: monospace; }")
         msg.exec()
         pass
 
     # --- Business logic methods
 
-    def load_dataset(self, path: str, count: int = 0, start_pos: int = 0, net_mode: NetMode = NetMode.TRAIN):
-        if self.reader.load_dataset(path, count, start_pos, net_mode) is False:
-            self.show_error_message(MSG_DATASET_IS_NOT_LOADED)
-            return False
-        return True
+    def train(self, path: str, records: int, epochs: int, streaming: bool, profiling: bool, model_path: str, control: JobControl):
+        # runs on the executor as a job, the result is the profiler of the run (or None)
+        profiler = Profiler() if profiling else None
+        self.reader.job_control = control
+        self.reader.set_profiler(profiler)
+        try:
+            if streaming:
+                self.reader.train_stream(path, epochs, self.post_progress, records)
+            else:
+                if not self.reader.load_dataset(path, records, 0, NetMode.TRAIN):
+                    raise ValueError(MSG_DATASET_IS_NOT_LOADED)
+
+                self.reader.train(epochs, self.post_progress)
+
+            # saved here on the worker thread, a queued job may start changing the weights right after this one
+            if model_path is not None and not self.reader.save_model(model_path):
+                raise OSError(MSG_MODEL_IS_NOT_SAVED)
+        finally:
+            self.reader.job_control = None
+            self.reader.set_profiler(None)
+        return profiler
 
-    def train(self, path, on_progress_callback):
+    def start_train(self, path: str):
+        # the settings are taken now, the job may only start after the queued ones
         records = self.main_tools_layout.get_max_records_for_training()
-        if not self.load_dataset(path, records, 1, NetMode.TRAIN):
-            return
-
-        self.reader.train(1, on_progress_callback)
+        epochs = self.main_tools_layout.get_epochs()
+        streaming = self.main_tools_layout.is_streaming_enabled()
+        profiling = self.main_tools_layout.is_profiling_enabled()
+        model_path = self.model_path
+
+        self.jobs.submit(f"Train on {Path(path).name}",
+                         lambda control: self.train(path, records, epochs, streaming, profiling, model_path, control),
+                         lambda job: self.on_job_finished.emit(job, self.on_finish_train))
+        self.main_tools_layout.show_gui_for_test_dataset()
         pass
 
-    def start_train(self, path: str):
-        def on_progress_callback(value):
-            self.on_update_progress.emit(value)
-            pass
-
-        def done_callback(_):
-            QTimer.singleShot(0, self.on_finish_train)
+    def on_finish_train(self, job: Job):
+        self.update_metrics_chart()
+        if job.status != DONE:
+            self.show_job_result(job)
+            return
 
-        future = self.executor.submit(self.train, path, on_progress_callback)
-        future.add_done_callback(done_callback)
-        self.main_tools_layout.set_buttons_enabled(False)
+        details = self.get_profile_report(job)
+        if not self.jobs.is_busy():
+            self.show_info_message(MSG_TRAINING_COMPLETED.format(self.reader.get_dataset_size()), details)
         pass
 
-    def on_finish_train(self):
-        self.show_info_message(MSG_TRAINING_COMPLETED.format(self.reader.get_dataset_size()))
-        self.main_tools_layout.show_gui_for_test_dataset()
-        self.main_tools_layout.set_buttons_enabled(True)
-        pass
+    def query(self, path: str, records: int, profiling: bool, control: JobControl):
+        # runs on the executor as a job, the result is the profiler of the run (or None)
+        profiler = Profiler() if profiling else None
+        self.reader.job_control = control
+        self.reader.set_profiler(profiler)
+        try:
+            if not self.reader.load_dataset(path, records, 0, NetMode.QUERY):
+                raise ValueError(MSG_DATASET_IS_NOT_LOADED)
+
+            self.reader.query(self.post_progress)
+        finally:
+            self.reader.job_control = None
+            self.reader.set_profiler(None)
+        return profiler
 
-    def query(self, path, on_progress_callback):
+    def start_query(self, path: str):
         records = self.main_tools_layout.get_max_records_for_test()
-        if not self.load_dataset(path, records, 1, NetMode.QUERY):
+        profiling = self.main_tools_layout.is_profiling_enabled()
+        self.jobs.submit(f"Test on {Path(path).name}",
+                         lambda control: self.query(path, records, profiling, control),
+                         lambda job: self.on_job_finished.emit(job, self.on_finish_query))
+        pass
+
+    def on_finish_query(self, job: Job):
+        if job.status != DONE:
+            self.show_job_result(job)
             return
 
-        self.reader.query(on_progress_callback)
+        self.renderer.reset(self.reader.get_dataset_size())
+        self.main_tools_layout.show_gui_for_statistics(self.reader.get_dataset_size())
+        self.update_test_info()
+        details = self.get_profile_report(job)
+        if not self.jobs.is_busy():
+            self.show_info_message(MSG_QUERY_COMPLETED.format(self.reader.get_dataset_size(), self.reader.get_accuracy()),
+                                   details)
         pass
 
-    def start_query(self, path: str):
-        def on_progress_callback(value):
-            self.on_update_progress.emit(value)
-            pass
-
-        def done_callback(_):
-            QTimer.singleShot(0, self.on_finish_query)
+    @staticmethod
+    def get_profile_report(job: Job):
+        # time breakdown of a profiled run, also printed when the message is skipped for queued jobs
+        if job.result is None:
+            return None
+
+        report = job.result.report()
+        print(f"{job.name} profile:\n{report}")
+        return report
+
+    def show_job_result(self, job: Job):
+        if job.status == FAILED:
+            self.show_error_message(MSG_JOB_FAILED.format(job.name, job.error))
+        else:
+            self.progressBar.setFormat(f"{job.name}: {job.status}")
+        pass
 
-        future = self.executor.submit(self.query, path, on_progress_callback)
-        future.add_done_callback(done_callback)
-        self.main_tools_layout.set_buttons_enabled(False)
+    def update_job_status(self):
+        status = self.jobs.get_status()
+        current = status["current"]
+        self.button_pause.setEnabled(current is not None)
+        self.button_pause.setText("Resume" if current and current["status"] == PAUSED else "Pause")
+        self.button_cancel.setEnabled(current is not None)
+        self.queued_jobs = len(status["queued"])
+        self.main_tools_layout.set_buttons_enabled(current is None)
         pass
 
-    def on_finish_query(self):
-        self.show_info_message(MSG_QUERY_COMPLETED.format(self.reader.get_dataset_size(), self.reader.get_accuracy()))
-        self.main_tools_layout.show_gui_for_statistics(self.reader.get_dataset_size())
-        self.update_test_info()
-        self.main_tools_layout.set_buttons_enabled(True)
+    def toggle_pause(self):
+        current = self.jobs.get_status()["current"]
+        if current is not None and current["status"] == PAUSED:
+            self.jobs.resume()
+        else:
+            self.jobs.pause()
         pass
 
     def get_current_record_info(self, index: int) -> str:
@@ -205,7 +449,16 @@ class MainWindow(QMainWindow):
         if label is None:
             return "No record found for the given index."
 
+        # the output of the answer as its confidence, when the last query has it
+        top = self.get_top_answers(index)
+        confidence = f" ({top[0][1]:.2f})" if top else ""
         return (f"Record {index + 1}:\n"
                 f"Actual value = {label[1]}\n"
-                f"Network answer = {label[0]}")
+                f"Network answer = {label[0]}{confidence}")
+
+    def get_top_answers(self, index: int) -> list:
+        evaluation = self.reader.get_evaluation()
+        if evaluation is None or index >= len(evaluation):
+            return []
+        return evaluation.get_top(index)
         pass
\ No newline at end of file
@@ -0,0 +1,116 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtGui import QImage, QPixmap, QPainter, QPen, QColor
+
+
+# rendered pixmaps kept in memory, a 336 x 336 pixmap takes about 450 KB
+RENDER_CACHE_CAPACITY = 128
+
+# records rendered ahead of the slider in the direction it is moving
+RENDER_LOOKAHEAD = 8
+
+
+def create_grid_overlay(size: int, cell_size: int) -> QPixmap:
+    overlay = QPixmap(size, size)
+    overlay.fill(Qt.GlobalColor.transparent)
+
+    painter = QPainter(overlay)
+    pen = QPen(QColor(0, 0, 0, 128))
+    pen.setStyle(Qt.PenStyle.DotLine)
+    pen.setWidth(1)
+    painter.setPen(pen)
+
+    for y in range(0, size, cell_size):
+        painter.drawLine(0, y, size, y)
+
+    for x in range(0, size, cell_size):
+        painter.drawLine(x, 0, x, size)
+
+    painter.end()
+    return overlay
+
+
+class RecordRenderer:
+
+    # pixmaps for the record viewer: LRU cache by record index, one shared grid overlay and idle-time
+    # prerendering ahead of the slider; get_images(indices) returns uint8 images as (n, height, width)
+    def __init__(self, get_images, size: int, cell_size: int,
+                 capacity: int = RENDER_CACHE_CAPACITY, lookahead: int = RENDER_LOOKAHEAD):
+        self.get_images = get_images
+        self.size = size
+        self.capacity = capacity
+        self.lookahead = lookahead
+        self.record_count = 0
+
+        self.cache = OrderedDict()
+        self.grid = create_grid_overlay(size, cell_size)
+        self.last_index = None
+        self.pending = []
+
+        self.timer = QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.render_pending)
+        pass
+
+    def reset(self, record_count: int):
+        # the dataset has changed, every cached image is stale
+        self.cache.clear()
+        self.pending.clear()
+        self.last_index = None
+        self.record_count = record_count
+        pass
+
+    def get_pixmap(self, index: int) -> QPixmap:
+        pixmap = self.cache.get(index)
+        if pixmap is None:
+            pixmap = self.render([index])[0]
+        else:
+            self.cache.move_to_end(index)
+
+        direction = 1 if self.last_index is None or index >= self.last_index else -1
+        self.last_index = index
+        self.schedule_prerender(index, direction)
+        return pixmap
+
+    def render(self, indices: list) -> list:
+        # invert the whole batch at once: dark digit on white background
+        images = 255 - np.asarray(self.get_images(indices), dtype=np.uint8)
+        count, height, width = images.shape
+
+        pixmaps = []
+        for index, image in zip(indices, images):
+            qimage = QImage(image.data, width, height, image.strides[0], QImage.Format.Format_Grayscale8)
+            pixmap = QPixmap.fromImage(qimage.scaled(self.size, self.size, Qt.AspectRatioMode.KeepAspectRatio))
+
+            painter = QPainter(pixmap)
+            painter.drawPixmap(0, 0, self.grid)
+            painter.end()
+
+            self.store(index, pixmap)
+            pixmaps.append(pixmap)
+
+        return pixmaps
+
+    def store(self, index: int, pixmap: QPixmap):
+        self.cache[index] = pixmap
+        self.cache.move_to_end(index)
+        while len(self.cache) > self.capacity:
+            self.cache.popitem(last=False)
+        pass
+
+    def schedule_prerender(self, index: int, direction: int):
+        ahead = (index + direction * step for step in range(1, self.lookahead + 1))
+        self.pending = [i for i in ahead if 0 <= i < self.record_count and i not in self.cache]
+        if self.pending and not self.timer.isActive():
+            self.timer.start(0)
+        pass
+
+    def render_pending(self):
+        # runs when the event loop is idle, the slider stays responsive
+        if self.pending:
+            indices, self.pending = self.pending, []
+            self.render(indices)
+        pass
@@ -0,0 +1,66 @@
+import numpy as np
+
+from PyQt6.QtCore import Qt, QPointF
+from PyQt6.QtGui import QPainter, QPen, QColor, QFont, QPolygonF
+from PyQt6.QtWidgets import QWidget
+
+
+# points drawn per series, the recorder downsamples to this
+CHART_POINTS = 300
+
+
+class QMetricsChart(QWidget):
+
+    # live training chart: batch loss as a line, validation accuracy per epoch as dots on a 0..100% scale
+    def __init__(self, height: int = 80):
+        super().__init__()
+        self.setFixedHeight(height)
+        self.batches = None
+        self.epochs = None
+
+    def set_metrics(self, batches: dict, epochs: dict):
+        self.batches = batches
+        self.epochs = epochs
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.fillRect(self.rect(), QColor(0, 0, 0, 140))
+
+        if self.batches is None or len(self.batches["loss"]) < 2:
+            painter.end()
+            return
+
+        left, top = 10, 22
+        width, height = self.width() - 2 * left, self.height() - top - 8
+        steps = self.batches["step"]
+        span = max(steps[-1] - steps[0], 1)
+
+        def x_of(step):
+            return left + (step - steps[0]) / span * width
+
+        # loss line, scaled to its own maximum
+        losses = self.batches["loss"]
+        top_loss = max(float(np.nanmax(losses)), 1e-12)
+        line = QPolygonF([QPointF(x_of(step), top + height * (1 - loss / top_loss)) for step, loss in zip(steps, losses)])
+        painter.setPen(QPen(QColor("#00ff88"), 1.5))
+        painter.drawPolyline(line)
+
+        # validation accuracy, placed at the last batch of its epoch
+        text = f"loss {losses[-1]:.4f}   {self.batches['samples_per_sec'][-1]:,.0f} samples/s"
+        accuracies = self.epochs["validation_accuracy"] if self.epochs is not None else []
+        if len(accuracies) and not np.all(np.isnan(accuracies)):
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(QColor("#ffffff"))
+            for epoch, accuracy in zip(self.epochs["epoch"], accuracies):
+                ended = steps[self.batches["epoch"] <= epoch]
+                if np.isnan(accuracy) or len(ended) == 0:
+                    continue
+                painter.drawEllipse(QPointF(x_of(ended[-1]), top + height * (1 - accuracy / 100)), 3, 3)
+            text += f"   validation {accuracies[~np.isnan(accuracies)][-1]:.2f}%"
+
+        painter.setPen(QColor("#ffffff"))
+        painter.setFont(QFont("TT Supermolot Neue Trl Db", 10, QFont.Weight.Bold))
+        painter.drawText(left, 16, text)
+        painter.end()
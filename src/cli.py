@@ -0,0 +1,194 @@
+import argparse
+import json
+import sys
+
+import numpy as np
+
+from src.core.activations import ACTIVATION_NAMES
+from src.core.lr_schedules import LR_SCHEDULE_NAMES
+from src.core.mnist_reader import MnistReader, NetMode, hidden_layers, input_nodes, output_nodes, learning_rate, \
+    non_sigmoid_learning_rate, lr_schedule, validation_split, early_stopping_patience
+from src.tools.benchmark import run_benchmarks, compare_with_baseline, HIDDEN_SIZES, BATCH_SIZES
+from src.utils.profiler import Profiler
+
+
+# --- Command line entry point
+# --- Trains, evaluates and benchmarks the network without a display, PyQt6 is never imported.
+# --- Usage:
+# ---   python -m src.cli train mnist_dataset/mnist_train.csv --epochs 3 --output model.nnm [--test mnist_dataset/mnist_test.csv]
+# ---   python -m src.cli evaluate model.nnm mnist_dataset/mnist_test.csv
+# ---   --profile prints the time of every phase (train / evaluate), --trace run.json writes a Chrome trace of them
+# ---   python -m src.cli benchmark --output bench.json
+
+DTYPES = {"float64": np.float64, "float32": np.float32, "float16": np.float16}
+
+
+def create_reader(args) -> MnistReader:
+    if args.model:
+        reader = MnistReader()
+        if not reader.load_model(args.model):
+            raise SystemExit(1)
+    else:
+        layers = [input_nodes, *args.hidden, output_nodes]
+        reader = MnistReader(layers, args.activations, DTYPES[args.dtype])
+        if args.lr is not None:
+            reader.n.lr = args.lr
+
+    reader.workers = args.workers
+    reader.prefetch_depth = args.prefetch
+    reader.shuffle = not args.no_shuffle
+    reader.lr_schedule = args.lr_schedule
+    reader.validation_split = args.validation_split
+    reader.early_stopping_patience = args.patience
+    return reader
+
+
+def start_profiler(reader: MnistReader, args):
+    if args.profile or args.trace:
+        reader.set_profiler(Profiler(trace=bool(args.trace)))
+    pass
+
+
+def finish_profiler(reader: MnistReader, args):
+    if reader.profiler is None:
+        return
+
+    print(reader.profiler.report())
+    if args.trace:
+        reader.profiler.export_chrome_trace(args.trace)
+        print(f"Chrome trace written to {args.trace}")
+    pass
+
+
+def evaluate(reader: MnistReader, path: str, count: int, start_pos: int) -> dict:
+    if not reader.load_dataset(path, count, start_pos, NetMode.QUERY):
+        raise SystemExit(1)
+
+    reader.query()
+    evaluation = reader.get_evaluation()
+    print(evaluation.format_report())
+    summary = evaluation.get_summary()
+    return {
+        "records": summary["records"],
+        "right_answers": summary["records"] - summary["errors"],
+        "accuracy": summary["accuracy"],
+        "class_accuracy": summary["class_accuracy"],
+        "confusion": summary["confusion"],
+    }
+
+
+def run_train(args) -> int:
+    reader = create_reader(args)
+    reader.checkpoint_path = args.output
+    reader.checkpoint_interval = args.checkpoint_interval
+    start_profiler(reader, args)
+
+    if args.stream:
+        reader.train_stream(args.train_path, args.epochs, None, args.records, args.start, args.batch)
+    else:
+        if not reader.load_dataset(args.train_path, args.records, args.start, NetMode.TRAIN):
+            return 1
+        reader.train(args.epochs, None, args.batch)
+
+    if args.output and not reader.save_model(args.output):
+        return 1
+
+    if args.metrics and not reader.export_metrics(args.metrics):
+        return 1
+
+    if args.test:
+        print(json.dumps(evaluate(reader, args.test, args.test_records, 0)))
+
+    finish_profiler(reader, args)
+    return 0
+
+
+def run_evaluate(args) -> int:
+    reader = MnistReader()
+    if not reader.load_model(args.model):
+        return 1
+
+    start_profiler(reader, args)
+    print(json.dumps(evaluate(reader, args.test_path, args.records, args.start)))
+    finish_profiler(reader, args)
+    return 0
+
+
+def run_benchmark(args) -> int:
+    results = run_benchmarks(args.records, args.repeat, args.hidden, args.batch, pixmap=False)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            failed = compare_with_baseline(results, json.load(file), args.threshold)
+        if failed:
+            print(f"{len(failed)} regressions over {args.threshold:.0%}: {', '.join(failed)}")
+            return 1
+    return 0
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="Headless MNIST training and evaluation")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    train = commands.add_parser("train", help="train a network and optionally save it")
+    train.add_argument("train_path")
+    train.add_argument("--records", type=int, default=0, help="number of records, 0 reads all")
+    train.add_argument("--start", type=int, default=0, help="first record to read")
+    train.add_argument("--epochs", type=int, default=1)
+    train.add_argument("--batch", type=int, help="mini-batch size, 1 trains per sample")
+    train.add_argument("--workers", type=int, default=1, help="worker processes for data-parallel training")
+    train.add_argument("--prefetch", type=int, default=0, help="batches prepared ahead on a background thread")
+    train.add_argument("--hidden", type=int, nargs="+", default=hidden_layers, help="hidden layer sizes")
+    train.add_argument("--activations", nargs="+", choices=ACTIVATION_NAMES, help="one per weight layer")
+    train.add_argument("--dtype", choices=list(DTYPES), default="float32")
+    train.add_argument("--lr", type=float, help=f"learning rate, {learning_rate} for an all-sigmoid network "
+                                                f"and {non_sigmoid_learning_rate} with relu / tanh / softmax layers")
+    train.add_argument("--lr-schedule", choices=LR_SCHEDULE_NAMES, default=lr_schedule)
+    train.add_argument("--no-shuffle", action="store_true", help="train in file order")
+    train.add_argument("--validation-split", type=float, default=validation_split,
+                       help="part of the records held out for validation when training several epochs")
+    train.add_argument("--patience", type=int, default=early_stopping_patience,
+                       help="epochs without validation improvement before stopping")
+    train.add_argument("--model", help="continue training a saved model")
+    train.add_argument("--output", help="model file, also written every --checkpoint-interval seconds")
+    train.add_argument("--checkpoint-interval", type=float, default=300)
+    train.add_argument("--stream", action="store_true", help="train while the CSV is being parsed")
+    train.add_argument("--metrics", help="export batch and epoch metrics, JSON for a .json path, CSV otherwise")
+    train.add_argument("--test", help="evaluate on this dataset after training")
+    train.add_argument("--test-records", type=int, default=0)
+    train.add_argument("--profile", action="store_true", help="print the time spent in every phase")
+    train.add_argument("--trace", help="write the timed phases as a Chrome trace JSON")
+    train.set_defaults(run=run_train)
+
+    evaluate_parser = commands.add_parser("evaluate", help="accuracy of a saved model on a dataset")
+    evaluate_parser.add_argument("model")
+    evaluate_parser.add_argument("test_path")
+    evaluate_parser.add_argument("--records", type=int, default=0)
+    evaluate_parser.add_argument("--start", type=int, default=0)
+    evaluate_parser.add_argument("--profile", action="store_true", help="print the time spent in every phase")
+    evaluate_parser.add_argument("--trace", help="write the timed phases as a Chrome trace JSON")
+    evaluate_parser.set_defaults(run=run_evaluate)
+
+    benchmark = commands.add_parser("benchmark", help="throughput benchmarks on synthetic data")
+    benchmark.add_argument("--records", type=int, default=2000)
+    benchmark.add_argument("--repeat", type=int, default=3)
+    benchmark.add_argument("--hidden", type=int, nargs="+", default=list(HIDDEN_SIZES))
+    benchmark.add_argument("--batch", type=int, nargs="+", default=list(BATCH_SIZES))
+    benchmark.add_argument("--output", help="write results to this JSON file")
+    benchmark.add_argument("--baseline", help="compare with results from an earlier run")
+    benchmark.add_argument("--threshold", type=float, default=0.1)
+    benchmark.set_defaults(run=run_benchmark)
+
+    return parser
+
+
+def main(argv: list = None) -> int:
+    args = create_parser().parse_args(argv)
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+import numpy as np
+
+
+# --- Activation functions
+# --- Every function writes into `out` so the network can reuse its layer buffers.
+# --- Derivatives are expressed through the layer output y = f(x), which is what backpropagation keeps.
+
+# scipy.special takes a while to import and is not needed to open the GUI, it is loaded on the first sigmoid call
+expit = None
+
+def load_expit():
+    global expit
+    from scipy.special import expit
+    return expit
+
+def sigmoid(x: np.ndarray, out: np.ndarray) -> np.ndarray:
+    return (expit or load_expit())(x, out=out)
+
+def sigmoid_derivative(y: np.ndarray, out: np.ndarray) -> np.ndarray:
+    np.subtract(1, y, out=out)
+    return np.multiply(out, y, out=out)
+
+def tanh(x: np.ndarray, out: np.ndarray) -> np.ndarray:
+    return np.tanh(x, out=out)
+
+def tanh_derivative(y: np.ndarray, out: np.ndarray) -> np.ndarray:
+    np.multiply(y, y, out=out)
+    return np.subtract(1, out, out=out)
+
+def relu(x: np.ndarray, out: np.ndarray) -> np.ndarray:
+    return np.maximum(x, 0, out=out)
+
+def relu_derivative(y: np.ndarray, out: np.ndarray) -> np.ndarray:
+    return np.greater(y, 0, out=out, casting="unsafe")
+
+def softmax(x: np.ndarray, out: np.ndarray) -> np.ndarray:
+    # rows are records, shift by the row maximum to keep exp() finite
+    np.subtract(x, x.max(axis=1, keepdims=True), out=out)
+    np.exp(out, out=out)
+    return np.divide(out, out.sum(axis=1, keepdims=True), out=out)
+
+
+# softmax has no element-wise derivative, it is only allowed on the output layer,
+# where it is paired with the cross-entropy loss and the error term becomes (targets - outputs)
+ACTIVATIONS = {
+    "sigmoid": (sigmoid, sigmoid_derivative),
+    "tanh": (tanh, tanh_derivative),
+    "relu": (relu, relu_derivative),
+    "softmax": (softmax, None),
+}
+
+ACTIVATION_NAMES = list(ACTIVATIONS)
@@ -0,0 +1,68 @@
+import queue
+import threading
+
+
+# seconds a blocked queue operation of the producer waits before it checks the stop event again
+POLL_INTERVAL = 0.1
+
+
+class BackgroundProducer:
+
+    # produce() runs on a daemon thread and hands its items over a queue of at most `depth` items (0 is unbounded),
+    # its exception is raised in the consumer after the last item
+    def __init__(self, depth: int = 0):
+        self.items = queue.Queue(maxsize=depth)
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.error = None
+
+    def __iter__(self):
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+        try:
+            while (item := self.items.get()) is not None:
+                yield item
+        finally:
+            self.close()
+
+        if self.error is not None:
+            raise self.error
+
+    def run(self):
+        try:
+            self.produce()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.put(None)
+        pass
+
+    def produce(self):
+        # subclasses put() their items here, on the background thread
+        raise NotImplementedError
+
+    def put(self, item) -> bool:
+        # False if the consumer has stopped reading
+        while not self.stop_event.is_set():
+            try:
+                self.items.put(item, timeout=POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def take(self, source: queue.Queue):
+        # the next item of a queue the consumer fills, None if the consumer has stopped reading
+        while not self.stop_event.is_set():
+            try:
+                return source.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                continue
+        return None
+
+    def close(self):
+        self.stop_event.set()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join()
+        pass
@@ -0,0 +1,105 @@
+import os
+
+import numpy as np
+
+from src.core.activations import ACTIVATION_NAMES
+from src.core.simple_neural_network import NeuralNetwork
+
+
+# --- Model checkpoint file
+# --- A fixed header with the training counters, the layer sizes, the activation of every weight layer
+# --- and then every weight matrix as raw little-endian data. Loading maps the whole file once
+# --- and slices the arrays from it. Version 1 files have no activations and use sigmoid everywhere.
+
+CHECKPOINT_MAGIC = b"SNNMODEL"
+CHECKPOINT_VERSION = 2
+CHECKPOINT_HEADER = np.dtype([
+    ("magic", "S8"),
+    ("version", "<i4"),
+    ("layer_count", "<i4"),
+    ("weight_dtype", "S8"),
+    ("learning_rate", "<f8"),
+    ("total_trained", "<i8"),
+    ("total_answers", "<i8"),
+    ("right_answers", "<i8"),
+])
+CHECKPOINT_HEADER_SIZE = 64
+CHECKPOINT_COUNTERS = ("total_trained", "total_answers", "right_answers")
+
+
+def save_checkpoint(path: str, network: NeuralNetwork, counters: dict = None, learning_rate: float = None):
+    # learning_rate overrides network.lr, which holds a scheduled value while a run is in progress
+    counters = counters or {}
+    layer_sizes = np.array(network.layers, dtype="<i8")
+    activations = np.array([ACTIVATION_NAMES.index(name) for name in network.activations], dtype="<i8")
+    weights = network.weights
+    weight_dtype = weights[0].dtype.newbyteorder("<")
+
+    header = np.zeros((), dtype=CHECKPOINT_HEADER)
+    header["magic"] = CHECKPOINT_MAGIC
+    header["version"] = CHECKPOINT_VERSION
+    header["layer_count"] = len(layer_sizes)
+    header["weight_dtype"] = weight_dtype.str.encode()
+    header["learning_rate"] = network.lr if learning_rate is None else learning_rate
+    for key in CHECKPOINT_COUNTERS:
+        header[key] = counters.get(key, 0)
+
+    # write next to the target and swap, so a crash during saving keeps the previous checkpoint
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(header.tobytes().ljust(CHECKPOINT_HEADER_SIZE, b"\0"))
+        file.write(layer_sizes.tobytes())
+        file.write(activations.tobytes())
+        for w in weights:
+            file.write(np.ascontiguousarray(w, dtype=weight_dtype).tobytes())
+
+    os.replace(tmp_path, path)
+    pass
+
+
+def load_checkpoint(path: str) -> tuple[NeuralNetwork, dict]:
+    data = np.memmap(path, dtype=np.uint8, mode="r")
+    if len(data) < CHECKPOINT_HEADER_SIZE:
+        raise ValueError(f"'{path}' is not a model checkpoint")
+
+    header = data[:CHECKPOINT_HEADER.itemsize].view(CHECKPOINT_HEADER)[0]
+    if header["magic"] != CHECKPOINT_MAGIC or header["version"] not in (1, CHECKPOINT_VERSION):
+        raise ValueError(f"'{path}' is not a model checkpoint")
+
+    offset = CHECKPOINT_HEADER_SIZE
+    layer_count = int(header["layer_count"])
+    layer_sizes = data[offset:offset + layer_count * 8].view("<i8")
+    offset += layer_count * 8
+
+    if header["version"] == 1:
+        activations = ["sigmoid"] * (layer_count - 1)
+    else:
+        codes = data[offset:offset + (layer_count - 1) * 8].view("<i8")
+        if np.any(codes < 0) or np.any(codes >= len(ACTIVATION_NAMES)):
+            raise ValueError(f"Checkpoint '{path}' has unknown activations")
+
+        activations = [ACTIVATION_NAMES[code] for code in codes]
+        offset += (layer_count - 1) * 8
+
+    weight_dtype = np.dtype(header["weight_dtype"].decode())
+    weights = []
+    for rows, cols in zip(layer_sizes[1:], layer_sizes[:-1]):
+        size = int(rows * cols) * weight_dtype.itemsize
+        if offset + size > len(data):
+            raise ValueError(f"Checkpoint '{path}' is truncated")
+
+        weights.append(data[offset:offset + size].view(weight_dtype).reshape(rows, cols))
+        offset += size
+
+    network = NeuralNetwork(layer_sizes.tolist(), float(header["learning_rate"]), activations,
+                            weight_dtype.newbyteorder("="))
+    # copy out of the map, the network keeps training on these arrays
+    network.weights = [np.array(w, dtype=network.dtype) for w in weights]
+    network.mark_weights_changed()
+
+    counters = {key: int(header[key]) for key in CHECKPOINT_COUNTERS}
+    return network, counters
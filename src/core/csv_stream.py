@@ -0,0 +1,49 @@
+import os
+
+from src.core.background import BackgroundProducer
+from src.utils.mnist_csv import iter_csv_chunks, get_text_size
+
+
+STREAM_CHUNK_SIZE = 1000
+# text read per parse, about a thousand MNIST records, so the first chunk is ready quickly
+STREAM_READ_BYTES = 2 * 2 ** 20
+STREAM_QUEUE_DEPTH = 8
+
+
+class CsvBatchStream(BackgroundProducer):
+
+    # a reader thread parses the CSV into (labels, pixels) chunks, at most queue_depth of them wait in memory
+    def __init__(self, path: str, count: int = 0, start_pos: int = 0,
+                 chunk_size: int = STREAM_CHUNK_SIZE, queue_depth: int = STREAM_QUEUE_DEPTH, profiler = None):
+        super().__init__(queue_depth)
+        self.path = path
+        self.count = count
+        self.start_pos = start_pos
+        self.chunk_size = chunk_size
+
+        # optional Profiler, times parsing on the reader thread
+        self.profiler = profiler
+
+        # estimated number of records, known after the first chunk is parsed
+        self.size_hint = count
+
+    def produce(self):
+        file_size = os.path.getsize(self.path)
+        chunks = iter_csv_chunks(self.path, self.count or 0, self.start_pos, chunk_bytes=STREAM_READ_BYTES)
+        profiler = self.profiler
+        while not self.stop_event.is_set():
+            start = profiler.begin() if profiler is not None else 0.0
+            chunk = next(chunks, None)
+            profiler.end("csv_parse", start) if profiler is not None else None
+            if chunk is None:
+                break
+
+            labels, pixels = chunk
+            if not self.size_hint:
+                record_size = get_text_size(labels, pixels) / len(labels)
+                self.size_hint = max(len(labels), int(file_size / record_size) - self.start_pos)
+
+            for i in range(0, len(labels), self.chunk_size):
+                self.put((labels[i:i + self.chunk_size], pixels[i:i + self.chunk_size]))
+        chunks.close()
+        pass
@@ -0,0 +1,110 @@
+import hashlib
+
+import numpy as np
+
+
+# answers with the highest network outputs kept per record
+TOP_K = 3
+
+
+def get_top_k(outputs: np.ndarray, k: int = TOP_K) -> tuple[np.ndarray, np.ndarray]:
+    # the k highest outputs of every row, best first, without sorting the whole row
+    k = min(k, outputs.shape[1])
+    top = np.argpartition(outputs, -k, axis=1)[:, -k:]
+    scores = np.take_along_axis(outputs, top, axis=1)
+    order = np.argsort(-scores, axis=1)
+    return np.take_along_axis(top, order, axis=1), np.take_along_axis(scores, order, axis=1)
+
+
+def get_dataset_fingerprint(labels: np.ndarray, pixels: np.ndarray) -> str:
+    # content hash of a dataset slice, two loads of the same records give the same fingerprint
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.asarray(pixels.shape, dtype=np.int64).tobytes())
+    digest.update(np.ascontiguousarray(labels, dtype=np.uint8))
+    digest.update(np.ascontiguousarray(pixels, dtype=np.uint8))
+    return digest.hexdigest()
+
+
+class EvaluationIndex:
+
+    # confusion matrix, per-class accuracy and error positions of a finished query, built once and vectorized
+    def __init__(self, actual: np.ndarray, predicted: np.ndarray, top_labels: np.ndarray = None,
+                 top_scores: np.ndarray = None, classes: int = 10):
+        self.classes = classes
+        self.actual = np.asarray(actual)
+        self.predicted = np.asarray(predicted)
+        self.top_labels = top_labels
+        self.top_scores = top_scores
+
+        # pair key actual * classes + predicted, records of one pair are contiguous in the stable sort
+        keys = self.actual.astype(np.intp) * classes + self.predicted
+        counts = np.bincount(keys, minlength=classes * classes)
+        self.confusion = counts.reshape(classes, classes)
+        self.pair_order = np.argsort(keys, kind="stable")
+        self.pair_offsets = np.concatenate(([0], np.cumsum(counts)))
+
+        totals = self.confusion.sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.class_accuracy = np.where(totals > 0, np.diag(self.confusion) / totals * 100, np.nan)
+
+        # errors sorted by position, and grouped by actual class for the per-class lookups
+        self.errors = np.flatnonzero(self.actual != self.predicted)
+        error_classes = self.actual[self.errors]
+        self.class_errors = self.errors[np.argsort(error_classes, kind="stable")]
+        self.class_error_offsets = np.concatenate(([0], np.cumsum(np.bincount(error_classes, minlength=classes))))
+
+    def __len__(self):
+        return len(self.actual)
+
+    def get_pair_positions(self, actual: int, predicted: int) -> np.ndarray:
+        key = actual * self.classes + predicted
+        return self.pair_order[self.pair_offsets[key]:self.pair_offsets[key + 1]]
+
+    def get_errors(self, actual: int = None) -> np.ndarray:
+        # positions of the misclassified records, ascending, of one class or of all of them
+        if actual is None:
+            return self.errors
+        return self.class_errors[self.class_error_offsets[actual]:self.class_error_offsets[actual + 1]]
+
+    def find_error(self, position: int, actual: int = None, step: int = 1):
+        # the next (step 1) or previous (step -1) error after position, wrapping around, None without errors
+        errors = self.get_errors(actual)
+        if len(errors) == 0:
+            return None
+
+        if step > 0:
+            index = np.searchsorted(errors, position, side="right")
+            return int(errors[index % len(errors)])
+
+        index = np.searchsorted(errors, position, side="left") - 1
+        return int(errors[index])
+
+    def get_error_rank(self, position: int, actual: int = None):
+        # index of the record among the errors of the class, None if it was answered right
+        errors = self.get_errors(actual)
+        index = np.searchsorted(errors, position)
+        return int(index) if index < len(errors) and errors[index] == position else None
+
+    def get_top(self, position: int) -> list:
+        # [(label, output), ...] of one record, best first
+        if self.top_labels is None:
+            return []
+        return list(zip(self.top_labels[position].tolist(), self.top_scores[position].tolist()))
+
+    def get_summary(self) -> dict:
+        return {
+            "records": len(self),
+            "errors": len(self.errors),
+            "accuracy": (1 - len(self.errors) / len(self)) * 100 if len(self) else 0.0,
+            "class_accuracy": [None if np.isnan(a) else float(a) for a in self.class_accuracy],
+            "confusion": self.confusion.tolist(),
+        }
+
+    def format_report(self) -> str:
+        # confusion matrix with actual classes as rows, and the accuracy of every class
+        header = "actual \\ predicted " + "".join(f"{c:>6}" for c in range(self.classes)) + "   accuracy %"
+        lines = [header]
+        for c in range(self.classes):
+            cells = "".join(f"{count:>6}" for count in self.confusion[c])
+            lines.append(f"{c:>18} {cells}   {self.class_accuracy[c]:>10.2f}")
+        return "\n".join(lines)
@@ -0,0 +1,188 @@
+import threading
+import time
+
+from collections import deque
+from concurrent.futures import Executor
+
+
+QUEUED = "queued"
+RUNNING = "running"
+PAUSED = "paused"
+DONE = "done"
+CANCELLED = "cancelled"
+FAILED = "failed"
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobControl:
+
+    # cancel / pause flags of one job, its check() once per batch raises JobCancelled or blocks while paused
+    def __init__(self):
+        self.cancel_event = threading.Event()
+        self.resume_event = threading.Event()
+        self.resume_event.set()
+
+    def check(self):
+        if not self.resume_event.is_set():
+            while not self.resume_event.wait(0.1):
+                if self.cancel_event.is_set():
+                    break
+
+        if self.cancel_event.is_set():
+            raise JobCancelled()
+        pass
+
+    def cancel(self):
+        self.cancel_event.set()
+        self.resume_event.set()
+        pass
+
+    def pause(self):
+        self.resume_event.clear()
+        pass
+
+    def resume(self):
+        self.resume_event.set()
+        pass
+
+    def is_paused(self) -> bool:
+        return not self.resume_event.is_set()
+
+
+class Job:
+
+    # function(control) does the work, on_done(job) is called from the worker thread when the job ends
+    def __init__(self, job_id: int, name: str, function, on_done = None):
+        self.id = job_id
+        self.name = name
+        self.function = function
+        self.on_done = on_done
+        self.control = JobControl()
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.start_time = None
+        self.end_time = None
+
+    def get_status(self) -> dict:
+        end_time = self.end_time or time.perf_counter()
+        return {
+            "id": self.id,
+            "name": self.name,
+            "status": PAUSED if self.status == RUNNING and self.control.is_paused() else self.status,
+            "elapsed_sec": end_time - self.start_time if self.start_time else 0.0,
+            "error": str(self.error) if self.error else None,
+        }
+
+
+class JobManager:
+
+    # jobs share one network, so they run one at a time in FIFO order; on_change(manager) may come from any thread
+    def __init__(self, executor: Executor, on_change = None):
+        self.executor = executor
+        self.on_change = on_change
+        self.lock = threading.Lock()
+        self.queue = deque()
+        self.current = None
+        self.history = []
+        self.next_id = 1
+
+    def submit(self, name: str, function, on_done = None) -> Job:
+        with self.lock:
+            job = Job(self.next_id, name, function, on_done)
+            self.next_id += 1
+            self.queue.append(job)
+        print(f"Job {job.id} queued: {name}")
+        self.start_next()
+        return job
+
+    def start_next(self):
+        with self.lock:
+            if self.current is not None or not self.queue:
+                job = None
+            else:
+                job = self.current = self.queue.popleft()
+                job.status = RUNNING
+                job.start_time = time.perf_counter()
+
+        if job is not None:
+            self.executor.submit(self.run, job)
+        self.notify()
+        pass
+
+    def run(self, job: Job):
+        try:
+            job.result = job.function(job.control)
+            job.status = DONE
+        except JobCancelled:
+            job.status = CANCELLED
+        except Exception as e:
+            job.status = FAILED
+            job.error = e
+            print(f"Job {job.id} failed: {e}")
+        finally:
+            job.end_time = time.perf_counter()
+            print(f"Job {job.id} {job.status} after {job.end_time - job.start_time:.2f} sec: {job.name}")
+            with self.lock:
+                self.current = None
+                self.history.append(job)
+
+            job.on_done(job) if job.on_done else None
+            self.start_next()
+        pass
+
+    def cancel(self, job_id: int = None):
+        # cancels the given job, or the running one, a queued job is simply dropped
+        with self.lock:
+            if self.current is not None and job_id in (None, self.current.id):
+                self.current.control.cancel()
+            else:
+                for job in list(self.queue):
+                    if job.id == job_id:
+                        self.queue.remove(job)
+                        job.status = CANCELLED
+                        self.history.append(job)
+        self.notify()
+        pass
+
+    def cancel_all(self):
+        with self.lock:
+            for job in self.queue:
+                job.status = CANCELLED
+                self.history.append(job)
+            self.queue.clear()
+        self.cancel()
+        pass
+
+    def pause(self):
+        with self.lock:
+            if self.current is not None:
+                self.current.control.pause()
+        self.notify()
+        pass
+
+    def resume(self):
+        with self.lock:
+            if self.current is not None:
+                self.current.control.resume()
+        self.notify()
+        pass
+
+    def is_busy(self) -> bool:
+        with self.lock:
+            return self.current is not None or bool(self.queue)
+
+    def get_status(self) -> dict:
+        with self.lock:
+            return {
+                "current": self.current.get_status() if self.current else None,
+                "queued": [job.get_status() for job in self.queue],
+                "finished": [job.get_status() for job in self.history[-10:]],
+            }
+
+    def notify(self):
+        self.on_change(self) if self.on_change else None
+        pass
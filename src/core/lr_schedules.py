@@ -0,0 +1,27 @@
+import math
+
+
+# --- Learning rate schedules
+# --- Every schedule maps (base learning rate, epoch, epochs) to the learning rate of that epoch,
+# --- the first epoch always trains with the base learning rate.
+
+def constant(lr: float, epoch: int, epochs: int) -> float:
+    return lr
+
+def step_decay(lr: float, epoch: int, epochs: int, drop: float = 0.5, every: int = 2) -> float:
+    return lr * drop ** (epoch // every)
+
+def cosine(lr: float, epoch: int, epochs: int, min_factor: float = 0.1) -> float:
+    # from lr on the first epoch down to lr * min_factor on the last one
+    if epochs <= 1:
+        return lr
+    return lr * (min_factor + (1 - min_factor) * 0.5 * (1 + math.cos(math.pi * epoch / (epochs - 1))))
+
+
+LR_SCHEDULES = {
+    "constant": constant,
+    "step": step_decay,
+    "cosine": cosine,
+}
+
+LR_SCHEDULE_NAMES = list(LR_SCHEDULES)
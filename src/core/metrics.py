@@ -0,0 +1,132 @@
+import csv
+import json
+import time
+
+import numpy as np
+
+
+# batches kept by the recorder, older ones are overwritten
+METRICS_CAPACITY = 65536
+
+# epochs kept by the recorder
+EPOCH_CAPACITY = 1024
+
+
+class MetricsRecorder:
+
+    # per-batch loss and throughput and per-epoch accuracy and learning rate, in preallocated ring buffers
+    def __init__(self, capacity: int = METRICS_CAPACITY, epoch_capacity: int = EPOCH_CAPACITY):
+        self.capacity = capacity
+        self.steps = np.zeros(capacity, dtype=np.int64)
+        self.epochs = np.zeros(capacity, dtype=np.int32)
+        self.times = np.zeros(capacity, dtype=np.float64)
+        self.losses = np.zeros(capacity, dtype=np.float64)
+        self.throughputs = np.zeros(capacity, dtype=np.float64)
+
+        self.epoch_capacity = epoch_capacity
+        self.epoch_numbers = np.zeros(epoch_capacity, dtype=np.int32)
+        self.epoch_accuracies = np.zeros(epoch_capacity, dtype=np.float64)
+        self.epoch_learning_rates = np.zeros(epoch_capacity, dtype=np.float64)
+
+        self.reset()
+        pass
+
+    def reset(self):
+        self.step = 0
+        self.epoch = 0
+        self.epoch_count = 0
+        self.start_time = time.perf_counter()
+        self.last_time = self.start_time
+        pass
+
+    def start_epoch(self, epoch: int):
+        self.epoch = epoch
+        self.last_time = time.perf_counter()
+        pass
+
+    def record_batch(self, loss: float, samples: int):
+        # loss is summed over the batch, it is stored per record
+        now = time.perf_counter()
+        i = self.step % self.capacity
+        self.steps[i] = self.step
+        self.epochs[i] = self.epoch
+        self.times[i] = now - self.start_time
+        self.losses[i] = loss / samples
+        self.throughputs[i] = samples / (now - self.last_time) if now > self.last_time else 0.0
+        self.last_time = now
+        self.step += 1
+        pass
+
+    def record_epoch(self, accuracy: float, learning_rate: float):
+        # accuracy is NaN for epochs without validation
+        if self.epoch_count < self.epoch_capacity:
+            i = self.epoch_count
+            self.epoch_numbers[i] = self.epoch
+            self.epoch_accuracies[i] = accuracy
+            self.epoch_learning_rates[i] = learning_rate
+            self.epoch_count += 1
+        pass
+
+    def get_batch_metrics(self) -> dict:
+        # recorded batches in chronological order
+        count = min(self.step, self.capacity)
+        order = np.arange(self.step - count, self.step) % self.capacity
+        return {
+            "step": self.steps[order],
+            "epoch": self.epochs[order],
+            "time_sec": self.times[order],
+            "loss": self.losses[order],
+            "samples_per_sec": self.throughputs[order],
+        }
+
+    def get_epoch_metrics(self) -> dict:
+        count = self.epoch_count
+        return {
+            "epoch": self.epoch_numbers[:count].copy(),
+            "validation_accuracy": self.epoch_accuracies[:count].copy(),
+            "learning_rate": self.epoch_learning_rates[:count].copy(),
+        }
+
+    def downsample(self, max_points: int) -> dict:
+        # batch metrics averaged over equal buckets, at most max_points per series
+        metrics = self.get_batch_metrics()
+        count = len(metrics["step"])
+        if count <= max_points:
+            return metrics
+
+        bucket = -(-count // max_points)
+        tail = count - count % bucket
+        result = {}
+        for name, values in metrics.items():
+            values = values.astype(np.float64)
+            means = values[:tail].reshape(-1, bucket).mean(axis=1)
+            if tail < count:
+                means = np.append(means, values[tail:].mean())
+            result[name] = means
+        return result
+
+    def export(self, path: str):
+        # JSON for a .json path, CSV otherwise, one row per batch and one per epoch
+        batches = self.get_batch_metrics()
+        epochs = self.get_epoch_metrics()
+
+        if path.lower().endswith(".json"):
+            with open(path, "w") as file:
+                json.dump({
+                    "batches": {name: values.tolist() for name, values in batches.items()},
+                    "epochs": {name: values.tolist() for name, values in epochs.items()},
+                }, file, indent=2)
+            return
+
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["kind", "epoch", "step", "time_sec", "loss", "samples_per_sec",
+                             "validation_accuracy", "learning_rate"])
+            for step, epoch, seconds, loss, throughput in zip(batches["step"], batches["epoch"], batches["time_sec"],
+                                                              batches["loss"], batches["samples_per_sec"]):
+                writer.writerow(["batch", epoch, step, f"{seconds:.6f}", f"{loss:.6g}", f"{throughput:.1f}", "", ""])
+            for epoch, accuracy, learning_rate in zip(epochs["epoch"], epochs["validation_accuracy"],
+                                                      epochs["learning_rate"]):
+                writer.writerow(["epoch", epoch, "", "", "", "", "" if np.isnan(accuracy) else f"{accuracy:.4f}",
+                                 f"{learning_rate:.6g}"])
+        pass
@@ -1,13 +1,20 @@
 import time
 
 import numpy as np
-import matplotlib.pyplot as plt
 
+from collections import OrderedDict
 from enum import Enum
-from PyQt6.QtGui import QImage, QPixmap
-from sympy.polys.polyconfig import query
 
 from src.utils.utils import *
+from src.core.checkpoint import save_checkpoint, load_checkpoint
+from src.core.csv_stream import CsvBatchStream
+from src.core.evaluation import EvaluationIndex, get_top_k, get_dataset_fingerprint, TOP_K
+from src.core.lr_schedules import LR_SCHEDULES
+from src.core.metrics import MetricsRecorder
+from src.core.parallel_trainer import ParallelTrainer
+from src.core.prefetcher import BatchPrefetcher
+from src.core.progress import ProgressTracker
+from src.core.preprocessing import normalize_inputs, fill_targets, get_target_on
 from src.core.simple_neural_network import NeuralNetwork
 
 
@@ -17,28 +24,94 @@ class NetMode(Enum):
     QUERY = 1
 
 input_nodes = 784
-hidden_nodes = 100
+hidden_layers = [100]
 output_nodes = 10
 learning_rate = 0.2
+# 0.2 is tuned for the original all-sigmoid network, relu / tanh / softmax layers diverge with it
+non_sigmoid_learning_rate = 0.05
+batch_size = 10
+query_batch_size = 1000
+evaluation_cache_size = 8
+checkpoint_interval = 300
+workers = 1
+prefetch_depth = 0
+shuffle = True
+lr_schedule = "cosine"
+validation_split = 0.1
+early_stopping_patience = 2
+min_improvement = 0.05
+
+def get_default_learning_rate(activations: list = None) -> float:
+    if not activations or all(name == "sigmoid" for name in activations):
+        return learning_rate
+    return non_sigmoid_learning_rate
 
 class MnistReader:
-    def __init__(self):
+    def __init__(self, layers: list = None, activations: list = None, dtype = np.float32):
+        # layers = [784, hidden..., 10], activations default to sigmoid for every layer
+        layers = layers or [input_nodes, *hidden_layers, output_nodes]
+        if layers[0] != input_nodes or layers[-1] != output_nodes:
+            raise ValueError(f"MNIST network needs {input_nodes} inputs and {output_nodes} outputs, got {layers}")
+
         self.total_trained = 0
-        self.total_answers = 0
-        self.right_answers = 0
-        self.train_data = []
-        self.query_data = []
-        self.scorecard = []
+        # results of the latest query of every model version: n.version -> (total answers, right answers)
+        self.version_results = {}
+        self.train_data = np.empty((0, input_nodes), dtype=np.uint8)
+        self.train_labels = np.empty(0, dtype=np.uint8)
+        self.train_size = 0
+        self.query_data = np.empty((0, input_nodes), dtype=np.uint8)
+        self.query_labels = np.empty(0, dtype=np.uint8)
+        self.query_fingerprint = None
+        self.scorecard = np.empty((0, 2), dtype=int)
+        # confusion matrix and error lookups of the last query, see EvaluationIndex, and the latest
+        # queries as (n.version, query_fingerprint) -> (scorecard, evaluation), unchanged weights are not re-scored
+        self.evaluation = None
+        self.evaluation_cache = OrderedDict()
         self.net_mode = NetMode.TRAIN
-        self.n = NeuralNetwork(input_nodes, hidden_nodes, output_nodes, learning_rate)
-
-        plt.grid(True, linestyle=':', alpha=0.5)
+        self.batch_size = batch_size
+
+        # more than one worker shards every batch across worker processes,
+        # startup_time is what the last train spent starting them
+        self.workers = workers
+        self.startup_time = 0.0
+
+        # batches prepared ahead on a background thread, 0 prepares them inline
+        self.prefetch_depth = prefetch_depth
+        self.pipeline_metrics = {}
+
+        # epoch settings: shuffled record order, learning rate schedule (see LR_SCHEDULES), and with
+        # more than one epoch a held-out validation slice that stops training once its accuracy (%)
+        # has not improved by min_improvement for early_stopping_patience epochs
+        self.shuffle = shuffle
+        self.lr_schedule = lr_schedule
+        self.validation_split = validation_split
+        self.early_stopping_patience = early_stopping_patience
+        self.min_improvement = min_improvement
+        self.validation_history = []
+
+        # optional Profiler shared with the network, see set_profiler
+        self.profiler = None
+
+        # completed / total records of the running train or query, reported to the callbacks
+        self.progress = ProgressTracker()
+
+        # JobControl of the job that runs this reader, checked once per batch to cancel or pause it
+        self.job_control = None
+
+        # loss and throughput of every batch, validation accuracy of every epoch, reset by each training run
+        self.metrics = MetricsRecorder()
+
+        # write a checkpoint every checkpoint_interval seconds of training if a path is set
+        self.checkpoint_path = None
+        self.checkpoint_interval = checkpoint_interval
+        self.checkpoint_time = 0.0
+        self.n = NeuralNetwork(layers, get_default_learning_rate(activations), activations, dtype)
         pass
 
     def get_dataset_size(self):
         match self.net_mode.value:
             case NetMode.TRAIN.value:
-                return len(self.train_data)
+                return self.train_size
             case NetMode.QUERY.value:
                 return len(self.query_data)
             case _:
@@ -46,160 +119,386 @@ class MnistReader:
                 return 0
 
     def get_accuracy(self):
-        if self.right_answers == 0:
+        # accuracy of the current weights, 0 until they have been tested
+        total_answers, right_answers = self.version_results.get(self.n.version, (0, 0))
+        if right_answers == 0:
             return 0.0
 
-        return self.right_answers / self.total_answers * 100
+        return right_answers / total_answers * 100
 
     def get_total_trained(self):
         return self.total_trained
 
     def get_total_answers(self):
-        return self.total_answers
-
-    def get_record_info(self, line_index: int = 0):
-        return self.scorecard[line_index] if self.query_data else None
-
-    def get_image_array(self, line_index: int = 0) -> np.ndarray:
-        try:
-            if self.query_data is None:
-                raise IndexError("Data not loaded")
-
-            if len(self.query_data) <= line_index:
-                raise ValueError("Line does not exist or index out of range")
+        return self.version_results.get(self.n.version, (0, 0))[0]
 
-            # remove extra spaces and newlines
-            line = self.query_data[line_index].strip()
+    def get_model_version(self):
+        return self.n.version
 
-            # skip the first value (label)
-            parts = line.split(",")[1:]
-            if len(parts) != input_nodes:
-                raise ValueError(f"Expected 784 values, got {len(parts)}.")
-
-            input_image = np.asfarray(parts).reshape((28, 28))
-            return input_image
-
-        except Exception as e:
-            raise ValueError(f"An error occurred while processing the data for image: {e}")
-
-    def get_plot_as_pixmap(self, line_index: int = 0) -> QPixmap:
-        image_array = self.get_image_array(line_index)
-
-        if image_array is None:
-            print(MSG_EMPTY_IMAGE_ARRAY)
-            return QPixmap()
-
-        if len(image_array.shape) != 2:
-            raise ValueError("Expected 2D grayscale image")
+    def get_record_info(self, line_index: int = 0):
+        return self.scorecard[line_index] if len(self.query_data) else None
 
-        if image_array.dtype != np.uint8:
-            image_array = (255 * image_array / np.max(image_array)).astype(np.uint8)
+    def get_evaluation(self):
+        return self.evaluation
 
-        image_array = 255 - image_array
-        height, width = image_array.shape
+    def set_profiler(self, profiler):
+        # times the phases of train / query (None turns it off), the network times its own passes
+        self.profiler = profiler
+        self.n.profiler = profiler
+        pass
 
-        qimage = QImage(
-            image_array.data, width, height,
-            image_array.strides[0],
-            QImage.Format.Format_Grayscale8
-        )
+    def get_image_batch(self, line_indices) -> np.ndarray:
+        # uint8 images (n, 28, 28) of the given test records
+        if self.query_data is None:
+            raise IndexError("Data not loaded")
 
-        qimage = qimage.copy()
-        pixmap = QPixmap.fromImage(qimage)
-        return pixmap
+        return self.query_data[np.asarray(line_indices)].reshape(-1, 28, 28)
 
-    def train(self, epochs: int = 1, callback = None):
-        print("Train started with epochs:", epochs)
+    def train(self, epochs: int = 1, callback = None, batch_size: int = None):
+        # batch_size = 1 keeps the original per-sample training path
+        batch_size = batch_size or self.batch_size
+        print(f"Train started with epochs: {epochs}, batch size: {batch_size}")
         init_time = time.perf_counter()
-        step_time = init_time
+        self.checkpoint_time = init_time
         count = 0
 
-        for e in range(epochs):
-            for record in self.train_data:
-                all_values = record.split(",")
-                inputs = (np.asfarray(all_values[1:]) / 255.0 * 0.99) + 0.01
+        train_size = self.get_validation_start(epochs)
+        self.progress.start("Training", train_size * epochs, callback)
+        labels, pixels = self.train_labels[:train_size], self.train_data[:train_size]
+        base_lr = self.n.lr
+        best_accuracy, best_weights, stale_epochs = -1.0, None, 0
+        self.validation_history = []
+        self.metrics.reset()
 
-                # output with 10 digits
-                targets = np.zeros(output_nodes) + 0.01
-
-                # set marker for the correct digit
-                targets[int(all_values[0])] = 0.99
-
-                self.n.train(inputs, targets)
-
-                count += 1
-                if (time.perf_counter() - step_time) > 0.03:
-                    callback(count) if callback else None
-                    step_time = time.perf_counter()
-            pass
-
-        callback(count) if callback else None
-
-        self.total_trained += len(self.train_data) * epochs
+        trainer = self.create_trainer(batch_size)
+        try:
+            for e in range(epochs):
+                self.n.lr = LR_SCHEDULES[self.lr_schedule](base_lr, e, epochs)
+                self.metrics.start_epoch(e)
+
+                # only the index order is shuffled, the records stay where they are
+                order = np.random.permutation(train_size) if self.shuffle else None
+                for trained in self.train_records(labels, pixels, batch_size, trainer, order):
+                    count += trained
+                    self.auto_checkpoint(self.progress.notify_time, count, base_lr)
+
+                if train_size == self.train_size:
+                    self.metrics.record_epoch(np.nan, self.n.lr)
+                    continue
+
+                accuracy = self.validate(self.train_labels[train_size:], self.train_data[train_size:])
+                self.validation_history.append(accuracy)
+                self.metrics.record_epoch(accuracy, self.n.lr)
+                print(f"Epoch {e + 1}/{epochs}: learning rate {self.n.lr:.4f}, validation accuracy {accuracy:.2f}%")
+
+                if accuracy > best_accuracy + self.min_improvement:
+                    best_accuracy, best_weights, stale_epochs = accuracy, [w.copy() for w in self.n.weights], 0
+                else:
+                    stale_epochs += 1
+                    if stale_epochs >= self.early_stopping_patience:
+                        print(f"Early stopping: no improvement for {stale_epochs} epochs")
+                        break
+                pass
+        finally:
+            trainer.close() if trainer else None
+            self.n.lr = base_lr
+            # a cancelled run keeps the weights and the count of what it has trained so far
+            self.total_trained += count
+
+        # keep the weights of the best validated epoch
+        if stale_epochs > 0 and best_weights is not None:
+            for w, best in zip(self.n.weights, best_weights):
+                np.copyto(w, best)
+            self.n.mark_weights_changed()
+
+        self.progress.finish()
         print(f"Time for train: {time.perf_counter() - init_time:.2f} sec")
         print(f"Total training data: {self.get_total_trained()}, last dataset: {self.get_dataset_size()}.\n")
 
         # self.train_data.clear()
 
-    def query(self, callback = None):
-        print("Query started")
+    def train_stream(self, path: str, epochs: int = 1, callback = None, count: int = 0, start_pos: int = 0,
+                     batch_size: int = None):
+        # train while a reader thread is still parsing the CSV, nothing is kept after the run
+        batch_size = batch_size or self.batch_size
+        print(f"Streaming train started with epochs: {epochs}, batch size: {batch_size}")
         init_time = time.perf_counter()
-        step_time = init_time
-        count = 0
-
-        self.scorecard.clear()
-        for record in self.query_data:
-            query(record)
-            all_values = record.split(",")
-
-            # first value is the label
-            correct_label = int(all_values[0])
-
-            # normalize the rest of the values
-            inputs = (np.asfarray(all_values[1:]) / 255.0 * 0.99) + 0.01
-
-            # query the result from the neural network
-            outputs = self.n.query(inputs)
+        self.checkpoint_time = init_time
+        trained_count = 0
+        epoch_count = 0
+        self.progress.start("Training", 0, callback)
 
-            # get the label with the highest value
-            label = np.argmax(outputs)
+        self.net_mode = NetMode.TRAIN
+        base_lr = self.n.lr
+        self.metrics.reset()
+        trainer = self.create_trainer(batch_size)
+        try:
+            # a stream is read in file order and has no validation slice, only the schedule applies
+            for e in range(epochs):
+                self.n.lr = LR_SCHEDULES[self.lr_schedule](base_lr, e, epochs)
+                self.metrics.start_epoch(e)
+                stream = CsvBatchStream(path, count, start_pos, profiler=self.profiler)
+                epoch_count = 0
+
+                for labels, pixels in stream:
+                    self.train_size = stream.size_hint
+                    self.progress.set_total(trained_count + stream.size_hint * (epochs - e))
+                    if pixels.shape[1] != input_nodes:
+                        raise ValueError(f"Expected {input_nodes} pixel values per record, got {pixels.shape[1]}.")
+
+                    for trained in self.train_records(labels, pixels, batch_size, trainer):
+                        epoch_count += trained
+                        self.auto_checkpoint(self.progress.notify_time, trained_count + epoch_count, base_lr)
+
+                self.train_size = epoch_count
+                trained_count += epoch_count
+                epoch_count = 0
+                self.metrics.record_epoch(np.nan, self.n.lr)
+                pass
+        finally:
+            trainer.close() if trainer else None
+            self.n.lr = base_lr
+            self.total_trained += trained_count + epoch_count
+
+        self.progress.finish()
+        print(f"Time for train: {time.perf_counter() - init_time:.2f} sec")
+        print(f"Total training data: {self.get_total_trained()}, last dataset: {self.get_dataset_size()}.\n")
 
-            self.scorecard.append([label, correct_label])
+    def auto_checkpoint(self, now: float, trained: int, base_lr: float):
+        # trained: records of the running train, total_trained only grows when it ends;
+        # base_lr: the rate the schedule starts from, n.lr holds the scheduled rate of the epoch
+        if self.checkpoint_path is None or self.checkpoint_interval <= 0:
+            return
+
+        if now - self.checkpoint_time > self.checkpoint_interval:
+            start = self.profiler.begin() if self.profiler is not None else 0.0
+            self.save_model(self.checkpoint_path, trained, base_lr)
+            self.checkpoint_time = time.perf_counter()
+            self.profiler.end("checkpoint", start) if self.profiler is not None else None
+        pass
 
-            count += 1
-            if (time.perf_counter() - step_time) > 0.03:
-                callback(count) if callback else None
-                step_time = time.perf_counter()
-            pass
+    def get_validation_start(self, epochs: int) -> int:
+        # a single epoch trains on the whole dataset, several hold out its last validation_split part
+        if epochs <= 1 or self.validation_split <= 0 or self.train_size < 2:
+            return self.train_size
+        return self.train_size - max(int(self.train_size * self.validation_split), 1)
+
+    def validate(self, labels: np.ndarray, pixels: np.ndarray) -> float:
+        # accuracy in percent, batched inference without touching the query scorecard
+        right_answers = 0
+        stop = 0
+        for inputs, _ in self.get_batches(labels, pixels, query_batch_size, False):
+            start, stop = stop, stop + len(inputs)
+            right_answers += int(np.count_nonzero(self.n.query_batch(inputs) == labels[start:stop]))
+        return right_answers / len(labels) * 100
+
+    def create_trainer(self, batch_size: int):
+        self.startup_time = 0.0
+        if self.workers <= 1 or batch_size <= 1:
+            return None
+
+        trainer = ParallelTrainer(self.n, self.workers, batch_size)
+        self.startup_time = trainer.startup_time
+        print(f"Parallel training with {self.workers} worker processes, started in {self.startup_time:.2f} sec")
+        return trainer
+
+    def train_records(self, labels: np.ndarray, pixels: np.ndarray, batch_size: int, trainer: ParallelTrainer = None,
+                      order: np.ndarray = None):
+        # yields the number of records trained after each batch
+        self.n.track_loss = True
+        profiler = self.profiler
+        for inputs, targets in self.get_batches(labels, pixels, batch_size, True, trainer, order):
+            if trainer is not None:
+                # forward / backward run in the workers, the step is timed as a whole
+                start = profiler.begin() if profiler is not None else 0.0
+                trainer.step(len(inputs))
+                loss = trainer.loss
+                profiler.end("parallel_step", start) if profiler is not None else None
+            elif batch_size == 1:
+                self.n.train(inputs[0], targets[0])
+                loss = self.n.loss
+            else:
+                self.n.train_batch(inputs, targets)
+                loss = self.n.loss
+
+            start = profiler.begin() if profiler is not None else 0.0
+            self.metrics.record_batch(loss, len(inputs))
+            self.progress.advance(len(inputs))
+            profiler.end("progress", start) if profiler is not None else None
+            yield len(inputs)
+
+            if self.job_control is not None:
+                self.job_control.check()
+
+    def get_batches(self, labels: np.ndarray, pixels: np.ndarray, batch_size: int, with_targets: bool = True,
+                    trainer: ParallelTrainer = None, order: np.ndarray = None):
+        # yields normalized (inputs, targets) batches, valid until the next one is requested,
+        # records are taken in `order` (an index permutation) when it is given
+        target_on = get_target_on(self.n.activations[-1], output_nodes)
+        if self.prefetch_depth > 0:
+            prefetcher = BatchPrefetcher(labels, pixels, batch_size, self.n.compute_dtype, self.prefetch_depth,
+                                         output_nodes, with_targets, order, target_on)
+            for inputs, targets in prefetcher:
+                # the workers read the batch from shared memory
+                if trainer is not None:
+                    count = len(inputs)
+                    np.copyto(trainer.inputs[:count], inputs)
+                    np.copyto(trainer.targets[:count], targets)
+                    inputs, targets = trainer.inputs[:count], trainer.targets[:count]
+                yield inputs, targets
+
+            self.pipeline_metrics = prefetcher.get_metrics()
+            print(f"Input wait: {self.pipeline_metrics['input_wait_sec']:.2f} sec, "
+                  f"compute: {self.pipeline_metrics['compute_sec']:.2f} sec, "
+                  f"prepare: {self.pipeline_metrics['prepare_sec']:.2f} sec")
+            return
+
+        rows = np.arange(batch_size)
+        profiler = self.profiler
+        for start in range(0, len(labels), batch_size):
+            index = slice(start, start + batch_size) if order is None else order[start:start + batch_size]
+            batch_labels = labels[index]
+            count = len(batch_labels)
+
+            # fill the network workspace (or the shared batch of the workers) in place, without copies
+            if trainer is not None:
+                inputs, targets = trainer.inputs[:count], trainer.targets[:count]
+            else:
+                workspace = self.n.get_workspace(count)
+                inputs, targets = workspace.inputs, workspace.targets
+
+            span_start = profiler.begin() if profiler is not None else 0.0
+            normalize_inputs(pixels[index], self.n.compute_dtype, inputs)
+            if with_targets:
+                fill_targets(batch_labels, targets, rows, target_on)
+            profiler.end("normalize", span_start) if profiler is not None else None
+
+            yield inputs, targets if with_targets else None
 
-        callback(count) if callback else None
+    def query(self, callback = None):
+        print("Query started")
+        init_time = time.perf_counter()
+        self.progress.start("Query", len(self.query_data), callback)
+
+        key = (self.n.version, self.query_fingerprint)
+        if key in self.evaluation_cache:
+            self.evaluation_cache.move_to_end(key)
+            self.scorecard, self.evaluation = self.evaluation_cache[key]
+            self.progress.advance(len(self.query_data))
+            self.progress.finish()
+            print(f"Model version {self.n.version} was already tested on this dataset, results are reused")
+            self.add_version_result()
+            return
+
+        # each scorecard row is [network answer, correct label], plus the best TOP_K answers with their outputs
+        self.scorecard = np.empty((len(self.query_data), 2), dtype=int)
+        self.evaluation = None
+        top_labels = np.empty((len(self.query_data), TOP_K), dtype=np.int8)
+        top_scores = np.empty((len(self.query_data), TOP_K), dtype=np.float32)
+        stop = 0
+        for inputs, _ in self.get_batches(self.query_labels, self.query_data, query_batch_size, False):
+            start, stop = stop, stop + len(inputs)
+
+            # get the labels with the highest values for the whole batch
+            self.scorecard[start:stop, 0], outputs = self.n.query_batch(inputs, return_outputs=True)
+            self.scorecard[start:stop, 1] = self.query_labels[start:stop]
+            span_start = self.profiler.begin() if self.profiler is not None else 0.0
+            top_labels[start:stop], top_scores[start:stop] = get_top_k(outputs)
+            self.profiler.end("top_k", span_start) if self.profiler is not None else None
+
+            self.progress.advance(len(inputs))
+            if self.job_control is not None:
+                self.job_control.check()
+
+        self.progress.finish()
+        start = self.profiler.begin() if self.profiler is not None else 0.0
+        self.evaluation = EvaluationIndex(self.scorecard[:, 1], self.scorecard[:, 0], top_labels, top_scores, output_nodes)
+        self.profiler.end("evaluation", start) if self.profiler is not None else None
 
         print(f"Time for query: {time.perf_counter() - init_time:.2f} sec")
-        scorecard_array = np.asarray(self.scorecard)
-        right_answers = sum(1 for i in scorecard_array if i[0] == i[1])
-        print(f"Right answers: {right_answers}")
+        self.evaluation_cache[key] = (self.scorecard, self.evaluation)
+        while len(self.evaluation_cache) > evaluation_cache_size:
+            self.evaluation_cache.popitem(last=False)
+        self.add_version_result()
+        pass
 
-        self.total_answers += len(scorecard_array)
-        self.right_answers += right_answers
-        print(f"Efficiency = {self.get_accuracy():.2f}%")
+    def add_version_result(self):
+        # replaces the result of the current weights, results of other versions are never blended in
+        right_answers = len(self.evaluation) - len(self.evaluation.errors)
+        self.version_results[self.n.version] = (len(self.evaluation), right_answers)
+        print(f"Right answers: {right_answers}")
+        print(f"Efficiency of model version {self.n.version} = {self.get_accuracy():.2f}%")
         pass
 
     def load_dataset(self, path: str, count: int = 0, start_pos: int = 0, net_mode: NetMode = NetMode.TRAIN):
+        start = self.profiler.begin() if self.profiler is not None else 0.0
         data = get_data_from_file(path, count, start_pos)
+        self.profiler.end("load_dataset", start) if self.profiler is not None else None
 
-        if not data:
+        if data is None or len(data[0]) == 0:
             print(MSG_DATASET_IS_NOT_LOADED)
             return False
 
+        labels, pixels = data
+        if pixels.shape[1] != input_nodes:
+            print(f"Expected {input_nodes} pixel values per record, got {pixels.shape[1]}.")
+            return False
+
         self.net_mode = net_mode
         match self.net_mode.value:
             case NetMode.TRAIN.value:
-                self.train_data = data
+                self.train_labels, self.train_data = labels, pixels
+                self.train_size = len(labels)
             case NetMode.QUERY.value:
-                self.query_data = data
+                self.query_labels, self.query_data = labels, pixels
+                self.query_fingerprint = get_dataset_fingerprint(labels, pixels)
             case _:
                 print(MSG_UNKNOWN_NET_MODE)
                 return False
 
-        print(f"Dataset loaded with {len(data)} records")
-        return True
\ No newline at end of file
+        print(f"Dataset loaded with {len(labels)} records")
+        return True
+
+    def save_model(self, path: str, trained: int = 0, learning_rate: float = None):
+        # the answer counters of the file are the test result of exactly these weights, or 0
+        total_answers, right_answers = self.version_results.get(self.n.version, (0, 0))
+        try:
+            save_checkpoint(path, self.n, {
+                "total_trained": self.total_trained + trained,
+                "total_answers": total_answers,
+                "right_answers": right_answers,
+            }, learning_rate)
+        except OSError as e:
+            print(f"Error: Model was not saved to '{path}': {e}")
+            return False
+
+        print(f"Model saved to {path}")
+        return True
+
+    def export_metrics(self, path: str):
+        try:
+            self.metrics.export(path)
+        except OSError as e:
+            print(f"Error: Metrics were not exported to '{path}': {e}")
+            return False
+
+        print(f"Metrics exported to {path}")
+        return True
+
+    def load_model(self, path: str):
+        try:
+            network, counters = load_checkpoint(path)
+        except (OSError, ValueError) as e:
+            print(f"Error: Model was not loaded from '{path}': {e}")
+            return False
+
+        if network.inodes != input_nodes or network.onodes != output_nodes:
+            print(f"Error: Model '{path}' does not match the {input_nodes} inputs / {output_nodes} outputs of MNIST.")
+            return False
+
+        network.profiler = self.profiler
+        self.n = network
+        self.total_trained = counters["total_trained"]
+        self.version_results[network.version] = (counters["total_answers"], counters["right_answers"])
+        print(f"Model loaded from {path}, trained on {self.total_trained} records")
+        return True
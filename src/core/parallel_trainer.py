@@ -0,0 +1,195 @@
+import multiprocessing as mp
+import threading
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from src.core.simple_neural_network import NeuralNetwork
+
+
+# seconds to wait for the workers at a synchronization point before giving up
+BARRIER_TIMEOUT = 120
+
+# state of a worker process, filled by init_worker
+worker_state = {}
+
+
+def split_rows(rows: int, parts: int, index: int) -> tuple[int, int]:
+    # contiguous shard of rows for one worker, the first (rows % parts) shards get one extra row
+    size, extra = divmod(rows, parts)
+    start = index * size + min(index, extra)
+    return start, start + size + (1 if index < extra else 0)
+
+
+def attach_array(name: str, shape: tuple, dtype) -> tuple:
+    memory = shared_memory.SharedMemory(name=name)
+    return memory, np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+
+
+def layer_views(flat: np.ndarray, shapes: list) -> list:
+    views, offset = [], 0
+    for shape in shapes:
+        size = int(np.prod(shape))
+        views.append(flat[offset:offset + size].reshape(shape))
+        offset += size
+    return views
+
+
+def init_worker(names: dict, layers: list, activations: list, dtype, batch_size: int, workers: int,
+                barrier, control, losses):
+    shapes = [(outputs, inputs) for inputs, outputs in zip(layers[:-1], layers[1:])]
+    weight_count = sum(rows * cols for rows, cols in shapes)
+
+    weights_memory, weights = attach_array(names["weights"], (weight_count,), dtype)
+    gradients_memory, gradients = attach_array(names["gradients"], (workers, weight_count), dtype)
+    inputs_memory, inputs = attach_array(names["inputs"], (batch_size, layers[0]), dtype)
+    targets_memory, targets = attach_array(names["targets"], (batch_size, layers[-1]), dtype)
+
+    # the worker network computes on the shared weights, the main process updates them between steps
+    network = NeuralNetwork(layers, 0.0, activations, dtype)
+    network.weights = layer_views(weights, shapes)
+    network.track_loss = True
+
+    worker_state.update(
+        memory=[weights_memory, gradients_memory, inputs_memory, targets_memory],
+        network=network, shapes=shapes, gradients=gradients, inputs=inputs, targets=targets,
+        workers=workers, barrier=barrier, control=control, losses=losses,
+    )
+    pass
+
+
+def run_worker(index: int):
+    # serves gradient requests until the main process sets a negative row count
+    state = worker_state
+    network, barrier, control = state["network"], state["barrier"], state["control"]
+    network.gradients = layer_views(state["gradients"][index], state["shapes"])
+
+    while True:
+        barrier.wait()
+        rows = control[0]
+        if rows < 0:
+            return
+
+        try:
+            start, stop = split_rows(rows, state["workers"], index)
+            if start < stop:
+                network.compute_gradients(state["inputs"][start:stop], state["targets"][start:stop])
+                state["losses"][index] = network.loss
+            else:
+                state["gradients"][index].fill(0)
+                state["losses"][index] = 0.0
+        except Exception:
+            barrier.abort()
+            raise
+
+        barrier.wait()
+
+
+class ParallelTrainer:
+
+    # every batch is split into one shard per worker process, their gradients are summed in shared memory
+    def __init__(self, network: NeuralNetwork, workers: int, batch_size: int):
+        if network.dtype != network.compute_dtype:
+            raise ValueError(f"Parallel training needs float32 or float64 weights, got {network.dtype}")
+
+        self.network = network
+        self.workers = workers
+        self.batch_size = batch_size
+        self.memory = {}
+
+        dtype = network.compute_dtype
+        shapes = [w.shape for w in network.weights]
+        weight_count = sum(w.size for w in network.weights)
+
+        weights = self.create_array("weights", (weight_count,), dtype)
+        self.gradients = self.create_array("gradients", (workers, weight_count), dtype)
+        self.inputs = self.create_array("inputs", (batch_size, network.inodes), dtype)
+        self.targets = self.create_array("targets", (batch_size, network.onodes), dtype)
+        self.gradient_sum = np.empty(weight_count, dtype=dtype)
+        self.gradient_views = layer_views(self.gradient_sum, shapes)
+
+        # the network trains on the shared weights until close()
+        self.shared_weights = layer_views(weights, shapes)
+        for shared, w in zip(self.shared_weights, network.weights):
+            np.copyto(shared, w)
+        network.weights = self.shared_weights
+
+        context = mp.get_context("spawn")
+        self.barrier = context.Barrier(workers + 1)
+        self.control = context.RawArray("q", 1)
+        self.losses = context.RawArray("d", workers)
+        self.loss = 0.0
+        names = {name: memory.name for name, memory in self.memory.items()}
+
+        # seconds spent spawning the workers until all of them are ready, not part of any step
+        init_time = time.perf_counter()
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=context, initializer=init_worker,
+            initargs=(names, network.layers, network.activations, dtype, batch_size, workers, self.barrier, self.control,
+                      self.losses)
+        )
+        self.futures = [self.executor.submit(run_worker, i) for i in range(workers)]
+        self.warm_up()
+        self.startup_time = time.perf_counter() - init_time
+        pass
+
+    def warm_up(self):
+        # a step without rows and without an update, returns once every worker has started and imported
+        self.control[0] = 0
+        self.wait()
+        self.wait()
+        pass
+
+    def create_array(self, name: str, shape: tuple, dtype) -> np.ndarray:
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        memory = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        self.memory[name] = memory
+        return np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+
+    def step(self, rows: int):
+        # train on the first `rows` records of self.inputs / self.targets
+        self.control[0] = rows
+        self.wait()
+        self.wait()
+
+        np.sum(self.gradients, axis=0, out=self.gradient_sum)
+        self.loss = sum(self.losses)
+        self.network.apply_gradients(self.gradient_views, self.shared_weights, rows)
+        pass
+
+    def wait(self):
+        try:
+            self.barrier.wait(BARRIER_TIMEOUT)
+        except threading.BrokenBarrierError:
+            # surface the worker exception if there is one
+            for future in self.futures:
+                if future.done() and future.exception() is not None:
+                    raise future.exception()
+            raise
+        pass
+
+    def close(self):
+        # copy the weights out of shared memory and stop the workers
+        self.network.weights = [np.array(w) for w in self.shared_weights]
+
+        try:
+            if not self.barrier.broken:
+                self.control[0] = -1
+                self.barrier.wait(BARRIER_TIMEOUT)
+        except threading.BrokenBarrierError:
+            pass
+        finally:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.shared_weights = self.gradient_views = self.inputs = self.targets = self.gradients = None
+            for memory in self.memory.values():
+                try:
+                    memory.close()
+                except BufferError:
+                    # an array view is still alive somewhere, the block is freed with it
+                    pass
+                memory.unlink()
+            self.memory = {}
+        pass
@@ -0,0 +1,84 @@
+import queue
+import time
+
+import numpy as np
+
+from src.core.background import BackgroundProducer
+from src.core.preprocessing import normalize_inputs, fill_targets, TARGET_ON
+
+
+class BatchPrefetcher(BackgroundProducer):
+
+    # normalized batches prepared up to `depth` ahead on a background thread, in `order` if it is given;
+    # they are written into a ring of depth + 1 buffers, so a yielded batch is valid until the next one
+    def __init__(self, labels: np.ndarray, pixels: np.ndarray, batch_size: int, dtype, depth: int = 2,
+                 output_nodes: int = 10, with_targets: bool = True, order: np.ndarray = None,
+                 target_on: float = TARGET_ON):
+        # the ready queue needs no bound, the ring of free buffers limits how far the producer gets ahead
+        super().__init__()
+        self.labels = labels
+        self.pixels = pixels
+        self.order = order
+        self.batch_size = batch_size
+        self.dtype = np.dtype(dtype)
+        self.with_targets = with_targets
+        self.target_on = target_on
+
+        self.free = queue.Queue()
+        for _ in range(depth + 1):
+            inputs = np.empty((batch_size, pixels.shape[1]), dtype=self.dtype)
+            targets = np.empty((batch_size, output_nodes), dtype=self.dtype) if with_targets else None
+            self.free.put((inputs, targets))
+
+        # seconds the consumer waited for input, spent on its own work, and the producer spent preparing
+        self.batches = 0
+        self.wait_time = 0.0
+        self.compute_time = 0.0
+        self.prepare_time = 0.0
+
+    def __iter__(self):
+        mark = time.perf_counter()
+        for buffers, count in super().__iter__():
+            now = time.perf_counter()
+            self.wait_time += now - mark
+            self.batches += 1
+            inputs, targets = buffers
+            yield inputs[:count], targets[:count] if targets is not None else None
+
+            # the batch is done, its buffers can be refilled
+            self.free.put(buffers)
+            mark = time.perf_counter()
+            self.compute_time += mark - now
+        pass
+
+    def produce(self):
+        rows = np.arange(self.batch_size)
+        for start in range(0, len(self.labels), self.batch_size):
+            buffers = self.take(self.free)
+            if buffers is None:
+                return
+
+            init_time = time.perf_counter()
+            inputs, targets = buffers
+            if self.order is None:
+                index = slice(start, start + self.batch_size)
+            else:
+                index = self.order[start:start + self.batch_size]
+            labels = self.labels[index]
+            normalize_inputs(self.pixels[index], self.dtype, inputs[:len(labels)])
+            if targets is not None:
+                fill_targets(labels, targets[:len(labels)], rows, self.target_on)
+            self.prepare_time += time.perf_counter() - init_time
+
+            self.put((buffers, len(labels)))
+        pass
+
+    def get_metrics(self) -> dict:
+        total = self.wait_time + self.compute_time
+        return {
+            "batches": self.batches,
+            "input_wait_sec": self.wait_time,
+            "compute_sec": self.compute_time,
+            "prepare_sec": self.prepare_time,
+            "input_wait_share": self.wait_time / total if total > 0 else 0.0,
+        }
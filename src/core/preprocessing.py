@@ -0,0 +1,32 @@
+import numpy as np
+
+
+# one-hot targets, squeezed into the range the sigmoid output can reach
+TARGET_OFF = 0.01
+TARGET_ON = 0.99
+
+
+def normalize_inputs(pixels: np.ndarray, dtype, out: np.ndarray = None) -> np.ndarray:
+    # map 0..255 to 0.01..1.0 directly in the network dtype, without a float64 temporary
+    dtype = np.dtype(dtype)
+    inputs = np.multiply(pixels, dtype.type(0.99 / 255.0), out=out, dtype=dtype)
+    return np.add(inputs, dtype.type(0.01), out=inputs)
+
+
+def get_target_on(output_activation: str, output_nodes: int) -> float:
+    # softmax outputs sum to 1 and so must the cross-entropy targets: with 0.99 the error (targets - outputs)
+    # of every record sums to 0.08, which pushes all weights the same way until the network diverges
+    if output_activation == "softmax":
+        return 1.0 - TARGET_OFF * (output_nodes - 1)
+    return TARGET_ON
+
+
+def fill_targets(labels: np.ndarray, out: np.ndarray, rows: np.ndarray, target_on: float = TARGET_ON) -> np.ndarray:
+    # rows = np.arange(n) for n >= len(labels), kept by the caller so no index array is allocated per batch
+
+    # output with 10 digits
+    out.fill(TARGET_OFF)
+
+    # set marker for the correct digit
+    out[rows[:len(labels)], labels] = target_on
+    return out
@@ -0,0 +1,77 @@
+import time
+
+
+# seconds between two progress notifications
+PROGRESS_INTERVAL = 0.03
+
+# weight of the newest interval in the smoothed throughput
+THROUGHPUT_SMOOTHING = 0.3
+
+
+class ProgressTracker:
+
+    # advance() is called per batch on the worker thread, the callback gets a snapshot at most every `interval` seconds
+    def __init__(self, interval: float = PROGRESS_INTERVAL):
+        self.interval = interval
+        self.callback = None
+        self.stage = ""
+        self.total = 0
+        self.completed = 0
+        self.start_time = 0.0
+        self.notify_time = 0.0
+        self.notify_completed = 0
+        self.throughput = 0.0
+
+    def start(self, stage: str, total: int, callback = None):
+        self.callback = callback
+        self.stage = stage
+        self.total = total
+        self.completed = 0
+        self.start_time = self.notify_time = time.perf_counter()
+        self.notify_completed = 0
+        self.throughput = 0.0
+        self.notify(self.start_time)
+        pass
+
+    def set_total(self, total: int):
+        # the total of a stream is only an estimate until it has been read
+        self.total = max(total, self.completed)
+        pass
+
+    def advance(self, units: int):
+        self.completed += units
+        now = time.perf_counter()
+        if now - self.notify_time >= self.interval:
+            self.notify(now)
+        pass
+
+    def finish(self):
+        # an early stop ends below the planned total, the bar still has to reach 100%
+        self.total = self.completed
+        self.notify(time.perf_counter())
+        pass
+
+    def notify(self, now: float):
+        if now > self.notify_time:
+            rate = (self.completed - self.notify_completed) / (now - self.notify_time)
+            self.throughput = rate if self.throughput == 0 else \
+                THROUGHPUT_SMOOTHING * rate + (1 - THROUGHPUT_SMOOTHING) * self.throughput
+        self.notify_time = now
+        self.notify_completed = self.completed
+
+        if self.callback is not None:
+            self.callback(self.get_snapshot(now))
+        pass
+
+    def get_snapshot(self, now: float = None) -> dict:
+        now = now or time.perf_counter()
+        remaining = max(self.total - self.completed, 0)
+        return {
+            "stage": self.stage,
+            "completed": self.completed,
+            "total": self.total,
+            "fraction": min(self.completed / self.total, 1.0) if self.total > 0 else 0.0,
+            "elapsed_sec": now - self.start_time,
+            "samples_per_sec": self.throughput,
+            "eta_sec": remaining / self.throughput if self.throughput > 0 else None,
+        }
@@ -1,48 +1,234 @@
+import itertools
+
 import numpy as np
-from scipy import special as ssp
+
+from src.core.activations import ACTIVATIONS
+
+# keep buffers for a few batch shapes only (full batches, the last partial batch, queries)
+MAX_BUFFER_SHAPES = 8
+
+# outputs are clipped to this before the log of the cross-entropy loss
+LOG_EPSILON = 1e-7
+
+# float16 is a storage format only, products and updates are accumulated in float32
+SUPPORTED_DTYPES = (np.float64, np.float32, np.float16)
+
+# every weight change takes the next number, unique across all networks of the process,
+# so a version identifies one exact set of weights (e.g. as a cache key for evaluation results)
+weight_versions = itertools.count(1)
+
+class Workspace:
+    # buffers for one batch shape: the copied inputs and targets, every layer output,
+    # every layer error term and the activation derivatives
+    def __init__(self, layers: list, batch_size: int, dtype):
+        self.inputs = np.empty((batch_size, layers[0]), dtype=dtype)
+        self.targets = np.empty((batch_size, layers[-1]), dtype=dtype)
+        self.outputs = [np.empty((batch_size, size), dtype=dtype) for size in layers[1:]]
+        self.deltas = [np.empty((batch_size, size), dtype=dtype) for size in layers[1:]]
+        self.derivatives = [np.empty((batch_size, size), dtype=dtype) for size in layers[1:]]
 
 class NeuralNetwork:
-    def __init__(self, inputnodes, hiddennodes, outputnodes, learningrate):
-        self.inodes = inputnodes
-        self.hnodes = hiddennodes
-        self.onodes = outputnodes
+    def __init__(self, layers: list, learningrate: float, activations: list = None, dtype = np.float32):
+        # layers = [inputs, hidden..., outputs], one activation per weight layer
+        if len(layers) < 2:
+            raise ValueError(f"Expected at least input and output layers, got {layers}")
+
+        activations = activations or ["sigmoid"] * (len(layers) - 1)
+        if len(activations) != len(layers) - 1:
+            raise ValueError(f"Expected {len(layers) - 1} activations, got {len(activations)}")
+
+        for i, name in enumerate(activations):
+            if name not in ACTIVATIONS:
+                raise ValueError(f"Unknown activation '{name}', expected one of {list(ACTIVATIONS)}")
+            if ACTIVATIONS[name][1] is None and i != len(activations) - 1:
+                raise ValueError(f"Activation '{name}' can only be used on the output layer")
+
+        self.layers = [int(size) for size in layers]
+        self.inodes = self.layers[0]
+        self.onodes = self.layers[-1]
+        self.activations = list(activations)
+
+        self.dtype = np.dtype(dtype)
+        if self.dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported dtype '{self.dtype}', expected one of {[np.dtype(t).name for t in SUPPORTED_DTYPES]}")
+        self.compute_dtype = np.dtype(np.float32) if self.dtype == np.float16 else self.dtype
 
-        self.wih = np.random.normal(0.0, pow(self.hnodes, -0.5), (self.hnodes, self.inodes))
-        self.who = np.random.normal(0.0, pow(self.onodes, -0.5), (self.onodes, self.hnodes))
+        # weights[i] maps layer i to layer i + 1 and has shape (layers[i + 1], layers[i])
+        self.weights = [
+            np.ascontiguousarray(np.random.normal(0.0, pow(outputs, -0.5), (outputs, inputs)), dtype=self.dtype)
+            for inputs, outputs in zip(self.layers[:-1], self.layers[1:])
+        ]
+        self.version = next(weight_versions)
 
         # коэффициент обучения
         self.lr = learningrate
 
-        # использование сигмоиды в качестве функции активации
-        self.activation_function = lambda x: ssp.expit(x)
+        # activation and gradient buffers, allocated once per batch shape
+        self.buffers = {}
+        self.gradients = None
+
+        # optional AllocationTracker, measures the temporary memory of every training step
+        self.allocation_tracker = None
+
+        # optional Profiler, times the forward / backward / update spans of training and the inference of queries
+        self.profiler = None
+
+        # float32 working copies of float16 weights
+        self.compute_weights = None
+
+        # with track_loss every backpropagation stores the loss summed over the batch: cross-entropy for
+        # a softmax output, half the squared output error otherwise
+        self.track_loss = False
+        self.loss = 0.0
         pass
 
-    # Train the neural network using inputs and targets
-    def train(self, inputs_list, targets_list):
-        inputs = np.array(inputs_list, ndmin=2).T
-        targets = np.array(targets_list, ndmin=2).T
+    def get_compute_weights(self) -> list:
+        if self.dtype == self.compute_dtype:
+            return self.weights
+
+        if self.compute_weights is None:
+            self.compute_weights = [np.empty(w.shape, dtype=self.compute_dtype) for w in self.weights]
+
+        for w, compute_w in zip(self.weights, self.compute_weights):
+            np.copyto(compute_w, w)
+        return self.compute_weights
+
+    def get_workspace(self, batch_size: int):
+        workspace = self.buffers.get(batch_size)
+        if workspace is None:
+            if len(self.buffers) >= MAX_BUFFER_SHAPES:
+                self.buffers.clear()
+            workspace = self.buffers[batch_size] = Workspace(self.layers, batch_size, self.compute_dtype)
+        return workspace
+
+    def as_batch(self, values, buffer: np.ndarray) -> np.ndarray:
+        # use the caller's array when it already has the compute layout, otherwise copy it into the workspace
+        if (isinstance(values, np.ndarray) and values.dtype == self.compute_dtype
+                and values.shape == buffer.shape and values.flags.c_contiguous):
+            return values
+
+        np.copyto(buffer, np.reshape(values, buffer.shape), casting="unsafe")
+        return buffer
 
-        hidden_inputs = np.dot(self.wih, inputs)
-        hidden_outputs = self.activation_function(hidden_inputs)
+    def forward(self, inputs: np.ndarray, workspace, weights: list = None) -> list:
+        # returns the outputs of every layer, the last one is the network answer
+        weights = weights or self.get_compute_weights()
 
-        final_inputs = np.dot(self.who, hidden_outputs)
-        final_outputs = self.activation_function(final_inputs)
+        layer_inputs = inputs
+        for w, name, layer_outputs in zip(weights, self.activations, workspace.outputs):
+            np.dot(layer_inputs, w.T, out=layer_outputs)
+            ACTIVATIONS[name][0](layer_outputs, out=layer_outputs)
+            layer_inputs = layer_outputs
 
-        output_errors = targets - final_outputs
-        hidden_errors = np.dot(self.who.T, output_errors)
+        return workspace.outputs
 
-        self.who += self.lr * np.dot(output_errors * final_outputs * (1 - final_outputs), np.transpose(hidden_outputs))
-        self.wih += self.lr * np.dot(hidden_errors * hidden_outputs * (1 - hidden_outputs), np.transpose(inputs))
+    # Train the neural network on a mini-batch: inputs (N, inodes) and targets (N, onodes), one record per row.
+    # The step follows the mean gradient of the batch, so one learning rate suits every batch size
+    # and a batch of one gives exactly the same update as train()
+    def train_batch(self, inputs, targets):
+        if self.allocation_tracker is not None:
+            self.allocation_tracker.begin()
+
+        weights = self.get_compute_weights()
+        batch_size = len(inputs) if np.ndim(inputs) == 2 else 1
+        self.apply_gradients(self.compute_gradients(inputs, targets, weights), weights, batch_size)
+
+        if self.allocation_tracker is not None:
+            self.allocation_tracker.end()
+        pass
+
+    # Backpropagate a batch and return the weight gradients summed over its records (not scaled by lr)
+    def compute_gradients(self, inputs, targets, weights: list = None) -> list:
+        weights = weights or self.get_compute_weights()
+        batch_size = len(inputs) if np.ndim(inputs) == 2 else 1
+        workspace = self.get_workspace(batch_size)
+        inputs = self.as_batch(inputs, workspace.inputs)
+        targets = self.as_batch(targets, workspace.targets)
+
+        profiler = self.profiler
+        start = profiler.begin() if profiler is not None else 0.0
+        outputs = self.forward(inputs, workspace, weights)
+        deltas = workspace.deltas
+        if profiler is not None:
+            profiler.end("forward", start)
+            start = profiler.begin()
+
+        # output layer error
+        np.subtract(targets, outputs[-1], out=deltas[-1])
+        if self.track_loss:
+            if self.activations[-1] == "softmax":
+                # softmax has no derivative buffer to fill, it holds the log of the outputs here
+                log_outputs = np.maximum(outputs[-1], LOG_EPSILON, out=workspace.derivatives[-1])
+                self.loss = -float(np.vdot(targets, np.log(log_outputs, out=log_outputs)))
+            else:
+                self.loss = 0.5 * float(np.vdot(deltas[-1], deltas[-1]))
+
+        # propagate the errors back before any weight is changed; like the original train(), the last hidden
+        # layer gets the raw output error (who.T @ output_errors), every hidden error term is the error
+        # times the derivative of its own layer before it goes further down
+        for i in range(len(weights) - 1, 0, -1):
+            np.dot(deltas[i], weights[i], out=deltas[i - 1])
+            deltas[i - 1] *= ACTIVATIONS[self.activations[i - 1]][1](outputs[i - 1], out=workspace.derivatives[i - 1])
+
+        # output error term, softmax has no derivative, it pairs with cross-entropy
+        derivative = ACTIVATIONS[self.activations[-1]][1]
+        if derivative is not None:
+            deltas[-1] *= derivative(outputs[-1], out=workspace.derivatives[-1])
+
+        if self.gradients is None:
+            self.gradients = [np.empty(w.shape, dtype=self.compute_dtype) for w in weights]
+
+        for i, gradient in enumerate(self.gradients):
+            layer_inputs = inputs if i == 0 else outputs[i - 1]
+            np.dot(deltas[i].T, layer_inputs, out=gradient)
+
+        if profiler is not None:
+            profiler.end("backward", start)
+        return self.gradients
+
+    # Add lr * gradients / batch_size to the weights, gradients summed over batch_size records give
+    # their mean that way; the gradients are used as scratch space
+    def apply_gradients(self, gradients: list, weights: list = None, batch_size: int = 1):
+        start = self.profiler.begin() if self.profiler is not None else 0.0
+        weights = weights or self.get_compute_weights()
+        for i, (w, gradient) in enumerate(zip(weights, gradients)):
+            gradient *= self.lr / batch_size
+            w += gradient
+
+            # round the float32 result back into float16 storage
+            if w is not self.weights[i]:
+                np.copyto(self.weights[i], w, casting="same_kind")
+        self.mark_weights_changed()
+
+        if self.profiler is not None:
+            self.profiler.end("update", start)
+        pass
+
+    # Code that writes self.weights directly has to call this, results cached for the old version are stale then
+    def mark_weights_changed(self):
+        self.version = next(weight_versions)
+        pass
+
+    # Train the neural network using inputs and targets
+    def train(self, inputs_list, targets_list):
+        self.train_batch(np.ravel(inputs_list), np.ravel(targets_list))
         pass
 
     # Calculate the output for given inputs
     def query(self, inputs_list):
-        inputs = np.array(inputs_list, ndmin=2).T
-
-        hidden_inputs = np.dot(self.wih, inputs)
-        hidden_outputs = self.activation_function(hidden_inputs)
+        workspace = self.get_workspace(1)
+        inputs = self.as_batch(inputs_list, workspace.inputs)
+        return self.forward(inputs, workspace)[-1].T.copy()
 
-        final_inputs = np.dot(self.who, hidden_outputs)
-        final_outputs = self.activation_function(final_inputs)
+    # Calculate the outputs for a batch of inputs (N, inodes) and return the predicted labels (N,),
+    # optionally together with the full output matrix (N, onodes)
+    def query_batch(self, inputs, return_outputs: bool = False):
+        start = self.profiler.begin() if self.profiler is not None else 0.0
+        workspace = self.get_workspace(len(inputs) if np.ndim(inputs) == 2 else 1)
+        inputs = self.as_batch(inputs, workspace.inputs)
+        final_outputs = self.forward(inputs, workspace)[-1]
 
-        return final_outputs
+        labels = np.argmax(final_outputs, axis=1)
+        if self.profiler is not None:
+            self.profiler.end("inference", start)
+        return (labels, final_outputs.copy()) if return_outputs else labels
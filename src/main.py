@@ -1,3 +1,8 @@
+import time
+
+# measured from here to the first shown window
+start_time = time.perf_counter()
+
 from PyQt6.QtGui import QFontDatabase
 from PyQt6.QtWidgets import QApplication
 from src.app.main_window import MainWindow
@@ -11,6 +16,7 @@ def main():
     QFontDatabase.addApplicationFont("resources/fonts/TT Supermolot Neue Trial DemiBold.ttf")
     window = MainWindow(executor)
     window.show()
+    print(f"Startup time: {time.perf_counter() - start_time:.2f} sec")
 
     return app.exec()
 
@@ -0,0 +1,279 @@
+import argparse
+import asyncio
+import json
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.core.checkpoint import load_checkpoint
+from src.core.preprocessing import normalize_inputs
+from src.core.simple_neural_network import NeuralNetwork
+
+
+# --- Inference server
+# --- Serves predictions of a saved model over HTTP (or a Unix socket) with asyncio, no extra packages.
+# --- Concurrent requests are coalesced into micro-batches for one batched forward pass.
+# --- Usage: python -m src.server model.nnm [--port 8000 | --unix /tmp/mnist.sock] [--max-batch 64 --max-wait-ms 2]
+# ---   POST /predict  {"pixels": [784 values 0..255]} or {"pixels": [[...], [...]]}
+# ---                  -> {"labels": [...], "confidences": [...]}
+# ---   GET  /stats    latency percentiles and throughput, POST /stats/reset starts a new measurement
+# ---   GET  /health
+
+MAX_BATCH_SIZE = 64
+MAX_WAIT_MS = 2.0
+MAX_BODY_SIZE = 64 * 2 ** 20
+
+# request latencies kept for the percentiles
+LATENCY_CAPACITY = 100000
+
+
+class LatencyStats:
+
+    # request latencies in a preallocated ring buffer plus throughput counters
+    def __init__(self, capacity: int = LATENCY_CAPACITY):
+        self.latencies = np.zeros(capacity, dtype=np.float64)
+        self.capacity = capacity
+        self.reset()
+
+    def reset(self):
+        self.requests = 0
+        self.records = 0
+        self.batches = 0
+        self.batched_records = 0
+        self.first_time = None
+        self.last_time = None
+        pass
+
+    def add_request(self, start_time: float, end_time: float, records: int):
+        self.latencies[self.requests % self.capacity] = end_time - start_time
+        self.requests += 1
+        self.records += records
+        # throughput is measured from the first request to the last answer, idle time before does not count
+        self.first_time = start_time if self.first_time is None else min(self.first_time, start_time)
+        self.last_time = end_time
+        pass
+
+    def add_batch(self, records: int):
+        self.batches += 1
+        self.batched_records += records
+        pass
+
+    def get_summary(self) -> dict:
+        latencies = self.latencies[:min(self.requests, self.capacity)] * 1000
+        elapsed = self.last_time - self.first_time if self.requests else 0.0
+        p50, p99 = np.percentile(latencies, [50, 99]) if len(latencies) else (0.0, 0.0)
+        return {
+            "requests": self.requests,
+            "records": self.records,
+            "elapsed_sec": elapsed,
+            "requests_per_sec": self.requests / elapsed if elapsed > 0 else 0.0,
+            "records_per_sec": self.records / elapsed if elapsed > 0 else 0.0,
+            "latency_p50_ms": float(p50),
+            "latency_p99_ms": float(p99),
+            "batches": self.batches,
+            "mean_batch_size": self.batched_records / self.batches if self.batches else 0.0,
+        }
+
+
+class MicroBatcher:
+
+    # collects requests until max_batch_size records wait or the first one waited max_wait seconds,
+    # then answers all of them with one forward pass on the inference thread
+    def __init__(self, network: NeuralNetwork, max_batch_size: int = MAX_BATCH_SIZE, max_wait: float = MAX_WAIT_MS / 1000):
+        self.network = network
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.queue = asyncio.Queue()
+        self.stats = LatencyStats()
+        self.inference = ThreadPoolExecutor(max_workers=1)
+        self.task = None
+
+    def start(self):
+        self.task = asyncio.get_running_loop().create_task(self.run())
+        pass
+
+    async def predict(self, pixels: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((pixels, future))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self.queue.get()]
+            records = len(items[0][0])
+            deadline = loop.time() + self.max_wait
+
+            while records < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                items.append(item)
+                records += len(item[0])
+
+            try:
+                labels, outputs = await loop.run_in_executor(self.inference, self.forward, [p for p, _ in items])
+            except Exception as e:
+                for _, future in items:
+                    future.set_exception(e) if not future.done() else None
+                continue
+
+            self.stats.add_batch(records)
+            start = 0
+            for pixels, future in items:
+                stop = start + len(pixels)
+                if not future.done():
+                    future.set_result((labels[start:stop], outputs[start:stop]))
+                start = stop
+
+    def forward(self, batches: list) -> tuple[np.ndarray, np.ndarray]:
+        pixels = np.concatenate(batches) if len(batches) > 1 else batches[0]
+        inputs = normalize_inputs(pixels, self.network.compute_dtype)
+        return self.network.query_batch(inputs, return_outputs=True)
+
+    def close(self):
+        self.task.cancel() if self.task else None
+        self.inference.shutdown(wait=False)
+        pass
+
+
+def parse_pixels(body: bytes, inodes: int) -> np.ndarray:
+    payload = json.loads(body)
+    pixels = np.asarray(payload["pixels"], dtype=np.float64)
+    if pixels.ndim == 1:
+        pixels = pixels[np.newaxis]
+    if pixels.ndim != 2 or pixels.shape[1] != inodes or len(pixels) == 0:
+        raise ValueError(f"Expected {inodes} pixel values per record, got shape {list(pixels.shape)}")
+    if pixels.min() < 0 or pixels.max() > 255:
+        raise ValueError("Pixel values must be in 0..255")
+    return pixels
+
+
+class InferenceServer:
+
+    # minimal HTTP/1.1 server with keep-alive on top of asyncio streams
+    def __init__(self, network: NeuralNetwork, max_batch_size: int = MAX_BATCH_SIZE, max_wait: float = MAX_WAIT_MS / 1000):
+        self.network = network
+        self.batcher = MicroBatcher(network, max_batch_size, max_wait)
+        self.server = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8000, unix_path: str = None):
+        self.batcher.start()
+        if unix_path:
+            self.server = await asyncio.start_unix_server(self.handle_connection, unix_path)
+            print(f"Serving on unix:{unix_path}")
+        else:
+            self.server = await asyncio.start_server(self.handle_connection, host, port)
+            print(f"Serving on http://{host}:{self.server.sockets[0].getsockname()[1]}")
+        pass
+
+    async def serve_forever(self):
+        async with self.server:
+            await self.server.serve_forever()
+
+    def close(self):
+        self.server.close() if self.server else None
+        self.batcher.close()
+        pass
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY_SIZE:
+                    await self.respond(writer, 413, {"error": "Request body is too large"})
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                status, response = await self.route(method, path, body)
+                await self.respond(writer, status, response)
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+        pass
+
+    async def route(self, method: str, path: str, body: bytes) -> tuple[int, dict]:
+        if method == "POST" and path == "/predict":
+            init_time = time.perf_counter()
+            try:
+                pixels = parse_pixels(body, self.network.inodes)
+            except (ValueError, KeyError, TypeError) as e:
+                return 400, {"error": str(e)}
+
+            # a failed forward pass fails every request of its batch, the connection stays usable
+            try:
+                labels, outputs = await self.batcher.predict(pixels)
+            except Exception as e:
+                print(f"Prediction failed: {e!r}")
+                return 500, {"error": f"Prediction failed: {e}"}
+            self.batcher.stats.add_request(init_time, time.perf_counter(), len(pixels))
+            return 200, {"labels": labels.tolist(), "confidences": outputs.max(axis=1).round(6).tolist()}
+
+        if method == "GET" and path == "/stats":
+            return 200, self.batcher.stats.get_summary()
+
+        if method == "POST" and path == "/stats/reset":
+            self.batcher.stats.reset()
+            return 200, {"status": "ok"}
+
+        if method == "GET" and path == "/health":
+            return 200, {"status": "ok"}
+
+        return 404, {"error": f"Unknown endpoint {method} {path}"}
+
+    @staticmethod
+    async def respond(writer: asyncio.StreamWriter, status: int, payload: dict):
+        body = json.dumps(payload).encode()
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large",
+                  500: "Internal Server Error"}[status]
+        writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+        await writer.drain()
+
+
+async def serve(model_path: str, host: str, port: int, unix_path: str, max_batch_size: int, max_wait: float):
+    network, counters = load_checkpoint(model_path)
+    print(f"Model loaded from {model_path}, trained on {counters['total_trained']} records")
+
+    server = InferenceServer(network, max_batch_size, max_wait)
+    await server.start(host, port, unix_path)
+    try:
+        await server.serve_forever()
+    finally:
+        print(json.dumps(server.batcher.stats.get_summary(), indent=2))
+        server.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HTTP inference server with micro-batching")
+    parser.add_argument("model")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--unix", help="listen on this Unix socket instead of TCP")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.model, args.host, args.port, args.unix, args.max_batch, args.max_wait_ms / 1000))
+    except KeyboardInterrupt:
+        pass
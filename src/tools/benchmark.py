@@ -0,0 +1,247 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+from itertools import chain
+
+import numpy as np
+
+from src.core.simple_neural_network import NeuralNetwork
+from src.utils.mnist_csv import read_mnist_csv
+from src.utils.utils import get_data_from_file
+
+
+# --- Benchmark suite
+# --- Headless throughput benchmarks on synthetic MNIST-shaped data, no real CSVs needed.
+# --- Usage: python -m src.tools.benchmark --output bench.json [--baseline baseline.json --threshold 0.1]
+# --- With --baseline the run fails (exit code 1) when a result is worse than the baseline by more than threshold.
+
+INPUT_NODES = 784
+OUTPUT_NODES = 10
+HIDDEN_SIZES = (50, 100, 200)
+BATCH_SIZES = (1, 10, 100)
+
+
+def make_synthetic_dataset(count: int, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    labels = rng.integers(0, OUTPUT_NODES, count, dtype=np.uint8)
+    pixels = rng.integers(0, 256, (count, INPUT_NODES), dtype=np.uint8)
+    return labels, pixels
+
+
+def write_synthetic_csv(path: str, labels: np.ndarray, pixels: np.ndarray):
+    np.savetxt(path, np.column_stack([labels, pixels]), fmt="%d", delimiter=",")
+    pass
+
+
+def best_time(function, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        init_time = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - init_time)
+    return min(times)
+
+
+def benchmark_train(labels, pixels, hidden: int, batch_size: int, repeat: int) -> float:
+    inputs = (pixels / 255.0 * 0.99 + 0.01).astype(np.float32)
+    targets = np.full((len(labels), OUTPUT_NODES), 0.01, dtype=np.float32)
+    targets[np.arange(len(labels)), labels] = 0.99
+    network = NeuralNetwork([INPUT_NODES, hidden, OUTPUT_NODES], 0.2)
+
+    def run():
+        if batch_size == 1:
+            for x, t in zip(inputs, targets):
+                network.train(x, t)
+        else:
+            for start in range(0, len(inputs), batch_size):
+                network.train_batch(inputs[start:start + batch_size], targets[start:start + batch_size])
+
+    return len(labels) / best_time(run, repeat)
+
+
+def benchmark_query(pixels, hidden: int, batch_size: int, repeat: int) -> float:
+    inputs = (pixels / 255.0 * 0.99 + 0.01).astype(np.float32)
+    network = NeuralNetwork([INPUT_NODES, hidden, OUTPUT_NODES], 0.2)
+
+    def run():
+        if batch_size == 1:
+            for x in inputs:
+                network.query(x)
+        else:
+            for start in range(0, len(inputs), batch_size):
+                network.query_batch(inputs[start:start + batch_size])
+
+    return len(inputs) / best_time(run, repeat)
+
+
+def benchmark_parse(path: str, repeat: int) -> tuple[float, float]:
+    # cold: the first load parses the CSV and builds the binary store, warm: later loads
+    init_time = time.perf_counter()
+    get_data_from_file(path)
+    cold_time = time.perf_counter() - init_time
+
+    warm_time = best_time(lambda: get_data_from_file(path)[1].sum(), repeat)
+    return cold_time, warm_time
+
+
+# --- Line-by-line parser, the reference for the byte-level one in mnist_csv (see src.tools.csv_report)
+
+def is_header_line(line: str) -> bool:
+    return not line.split(",", 1)[0].strip().isdigit()
+
+
+def iter_records(file):
+    # iterate over the CSV lines, skipping the column header row some MNIST exports have
+    first_line = next(file, None)
+    if first_line is None or is_header_line(first_line):
+        return file
+    return chain([first_line], file)
+
+
+def parse_records(lines: list) -> tuple[np.ndarray, np.ndarray]:
+    # split CSV records into a label vector (N,) and a pixel matrix (N, 784)
+    values = np.asfarray([line.split(",") for line in lines]).reshape(len(lines), -1)
+    return values[:, 0].astype(int), values[:, 1:]
+
+
+def parse_csv_lines(path: str) -> tuple[np.ndarray, np.ndarray]:
+    # the line-by-line parser, split and float conversion of every value
+    with open(path, "r") as file:
+        labels, pixels = parse_records(list(iter_records(file)))
+    return labels.astype(np.uint8), pixels.astype(np.uint8)
+
+
+def benchmark_csv_parse(path: str, repeat: int) -> tuple[float, float]:
+    # records/sec of the line parser and of the byte-level one, without the binary store
+    count = len(read_mnist_csv(path)[0])
+    lines_time = best_time(lambda: parse_csv_lines(path), repeat)
+    bytes_time = best_time(lambda: read_mnist_csv(path), repeat)
+    return count / lines_time, count / bytes_time
+
+
+def benchmark_pixmap(path: str, records: int, repeat: int):
+    # cold render and cache hit latency of the record viewer, returns None when Qt is not available
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    try:
+        from PyQt6.QtGui import QGuiApplication
+        from src.app.record_renderer import RecordRenderer
+        from src.core.mnist_reader import MnistReader, NetMode
+    except ImportError as e:
+        print(f"Pixmap benchmark skipped: {e}")
+        return None
+
+    app = QGuiApplication.instance() or QGuiApplication(sys.argv[:1])
+    reader = MnistReader()
+    reader.load_dataset(path, records, 0, NetMode.QUERY)
+    count = reader.get_dataset_size()
+    renderer = RecordRenderer(reader.get_image_batch, 336, 84)
+
+    def render_cold():
+        renderer.reset(count)
+        for i in range(count):
+            renderer.render([i])
+
+    # the last `capacity` records are still cached after a cold pass
+    cached = range(max(count - renderer.capacity, 0), count)
+    cold_time = best_time(render_cold, repeat)
+    hit_time = best_time(lambda: [renderer.get_pixmap(i) for i in cached], repeat)
+    del renderer, app
+    return cold_time / count * 1000, hit_time / len(cached) * 1000
+
+
+def run_benchmarks(records: int = 2000, repeat: int = 3, hidden_sizes=HIDDEN_SIZES, batch_sizes=BATCH_SIZES,
+                   pixmap: bool = True) -> dict:
+    # pixmap = False skips the record viewer benchmark, which needs PyQt6
+    labels, pixels = make_synthetic_dataset(records)
+    results = {}
+
+    def add(name, value, unit, higher_is_better=True):
+        results[name] = {"value": value, "unit": unit, "higher_is_better": higher_is_better}
+        print(f"{name:<36} {value:>14.2f} {unit}")
+
+    for hidden in hidden_sizes:
+        for batch_size in batch_sizes:
+            add(f"train/h{hidden}/b{batch_size}", benchmark_train(labels, pixels, hidden, batch_size, repeat), "samples/sec")
+        for batch_size in batch_sizes:
+            add(f"query/h{hidden}/b{batch_size}", benchmark_query(pixels, hidden, batch_size, repeat), "samples/sec")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "synthetic.csv")
+        write_synthetic_csv(path, labels, pixels)
+
+        cold_time, warm_time = benchmark_parse(path, repeat)
+        add("parse/cold", cold_time * 1000, "ms", False)
+        add("parse/warm", warm_time * 1000, "ms", False)
+
+        lines_rate, bytes_rate = benchmark_csv_parse(path, repeat)
+        add("parse/lines", lines_rate, "records/sec")
+        add("parse/bytes", bytes_rate, "records/sec")
+
+        pixmap_latency = benchmark_pixmap(path, min(records, 500), repeat) if pixmap else None
+        if pixmap_latency is not None:
+            add("pixmap/latency", pixmap_latency[0], "ms/record", False)
+            add("pixmap/cached", pixmap_latency[1], "ms/record", False)
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "records": records,
+            "repeat": repeat,
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def compare_with_baseline(results: dict, baseline: dict, threshold: float) -> list:
+    # returns the names of results that are worse than the baseline by more than threshold (0.1 = 10%)
+    regressions = []
+    for name, base in baseline["results"].items():
+        current = results["results"].get(name)
+        if current is None or base["value"] == 0:
+            continue
+
+        if base["higher_is_better"]:
+            change = current["value"] / base["value"] - 1
+        else:
+            change = base["value"] / current["value"] - 1
+
+        status = "REGRESSION" if change < -threshold else "ok"
+        print(f"{name:<36} {base['value']:>12.2f} -> {current['value']:>12.2f} {change:>+8.1%} {status}")
+        if change < -threshold:
+            regressions.append(name)
+
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Training / inference throughput benchmarks on synthetic MNIST data")
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--hidden", type=int, nargs="+", default=list(HIDDEN_SIZES))
+    parser.add_argument("--batch", type=int, nargs="+", default=list(BATCH_SIZES))
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare with results from an earlier run")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+
+    bench_results = run_benchmarks(args.records, args.repeat, args.hidden, args.batch)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(bench_results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            failed = compare_with_baseline(bench_results, json.load(file), args.threshold)
+        if failed:
+            print(f"{len(failed)} regressions over {args.threshold:.0%}: {', '.join(failed)}")
+            sys.exit(1)
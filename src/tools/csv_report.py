@@ -0,0 +1,61 @@
+import argparse
+import os
+import time
+
+import numpy as np
+
+from src.tools.benchmark import parse_csv_lines
+from src.utils.mnist_csv import read_mnist_csv
+
+
+# --- CSV parse report
+# --- Parse throughput of an MNIST CSV with the line-by-line parser and with the byte-level one,
+# --- both results must be equal. Neither uses the binary dataset store, this is the cost of a first load.
+# --- Usage: python -m src.tools.csv_report mnist_dataset/mnist_train.csv [--repeat 3]
+
+def time_parser(function, repeat: int) -> tuple[float, tuple]:
+    best = None
+    result = None
+    for _ in range(repeat):
+        init_time = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - init_time
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def run_csv_report(path: str, repeat: int = 3) -> list:
+    size_mb = os.path.getsize(path) / 2 ** 20
+    lines_time, lines_result = time_parser(lambda: parse_csv_lines(path), repeat)
+    bytes_time, bytes_result = time_parser(lambda: read_mnist_csv(path), repeat)
+
+    if not all(np.array_equal(a, b) for a, b in zip(lines_result, bytes_result)):
+        raise ValueError(f"The parsers disagree on '{path}'")
+
+    count = len(bytes_result[0])
+    return [
+        {"parser": name, "records": count, "sec": elapsed, "mb_per_sec": size_mb / elapsed,
+         "records_per_sec": count / elapsed, "speedup": lines_time / elapsed}
+        for name, elapsed in (("lines", lines_time), ("bytes", bytes_time))
+    ]
+
+
+def print_csv_report(results: list):
+    print(f"{'parser':<8} {'records':>8} {'sec':>8} {'MB/s':>8} {'records/s':>11} {'speedup':>8}")
+    for row in results:
+        print(f"{row['parser']:<8} {row['records']:>8} {row['sec']:>8.3f} {row['mb_per_sec']:>8.1f} "
+              f"{row['records_per_sec']:>11.0f} {row['speedup']:>7.1f}x")
+    pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse throughput of an MNIST CSV, line parser vs byte-level parser")
+    parser.add_argument("path")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print_csv_report(run_csv_report(args.path, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
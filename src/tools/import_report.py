@@ -0,0 +1,52 @@
+import argparse
+import os
+import subprocess
+import sys
+
+
+# --- Import time report
+# --- Runs `python -X importtime` on the GUI entry modules in a fresh interpreter and prints the
+# --- slowest imports plus the heavy dependencies that should stay out of the launch path.
+# --- Usage: python -m src.tools.import_report [--module src.app.main_window] [--top 15]
+
+WATCHED_MODULES = ("numpy", "PyQt6.QtWidgets", "matplotlib.pyplot", "scipy.special", "sympy")
+
+
+def measure_imports(module: str) -> dict:
+    # cumulative import time in seconds of every module imported by `module`
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, env=env)
+    if result.returncode != 0:
+        raise RuntimeError(f"Failed to import '{module}':\n{result.stderr}")
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+
+def print_import_report(module: str, times: dict, top: int):
+    print(f"Import of {module}: {times.get(module, 0.0):.3f} sec")
+
+    print(f"\n{'watched module':<28} {'sec':>8}")
+    for name in WATCHED_MODULES:
+        status = f"{times[name]:>8.3f}" if name in times else f"{'-':>8} (not imported)"
+        print(f"{name:<28} {status}")
+
+    print(f"\n{'slowest imports':<40} {'sec':>8}")
+    for name, seconds in sorted(times.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"{name:<40} {seconds:>8.3f}")
+    pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import time of the application modules")
+    parser.add_argument("--module", default="src.app.main_window")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    print_import_report(args.module, measure_imports(args.module), args.top)
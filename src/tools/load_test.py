@@ -0,0 +1,138 @@
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+
+from src.utils.utils import get_data_from_file
+
+
+# --- Load generator for the inference server
+# --- Opens `concurrency` keep-alive connections, each sends requests back to back, and reports
+# --- client side p50/p99 latency and throughput next to the server's own /stats.
+# --- Usage:
+# ---   python -m src.server model.nnm --max-batch 64 --max-wait-ms 2 &
+# ---   python -m src.tools.load_test --requests 5000 --concurrency 64 [--data mnist_dataset/mnist_test.csv]
+# ---   --per-request 8 sends 8 records in every request, --unix /tmp/mnist.sock talks to a Unix socket server
+
+
+async def open_connection(host: str, port: int, unix_path: str = None):
+    if unix_path:
+        return await asyncio.open_unix_connection(unix_path)
+    return await asyncio.open_connection(host, port)
+
+
+async def request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, method: str, path: str,
+                  payload: dict = None) -> tuple[int, dict]:
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+
+    status = int((await reader.readline()).split(b" ", 2)[1])
+    length = 0
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def run_client(host: str, port: int, unix_path: str, payloads: list, latencies: np.ndarray, counter: list) -> int:
+    reader, writer = await open_connection(host, port, unix_path)
+    errors = 0
+    try:
+        while counter[0] < len(latencies):
+            index = counter[0]
+            counter[0] += 1
+
+            init_time = time.perf_counter()
+            status, _ = await request(reader, writer, "POST", "/predict", {"pixels": payloads[index % len(payloads)]})
+            latencies[index] = time.perf_counter() - init_time
+            errors += status != 200
+    finally:
+        writer.close()
+    return errors
+
+
+async def run_load_test(host: str, port: int, unix_path: str, pixels: np.ndarray, requests: int,
+                        concurrency: int, per_request: int = 1) -> dict:
+    # payloads are prepared before the clock starts, the client should measure the server, not json.dumps
+    rows = np.asarray(pixels, dtype=np.int64)
+    if per_request == 1:
+        payloads = [row.tolist() for row in rows]
+    else:
+        payloads = [rows[np.arange(i, i + per_request) % len(rows)].tolist() for i in range(0, len(rows), per_request)]
+
+    reader, writer = await open_connection(host, port, unix_path)
+    try:
+        await request(reader, writer, "POST", "/stats/reset")
+    finally:
+        writer.close()
+
+    latencies = np.zeros(requests, dtype=np.float64)
+    counter = [0]
+
+    init_time = time.perf_counter()
+    errors = await asyncio.gather(*(run_client(host, port, unix_path, payloads, latencies, counter)
+                                    for _ in range(concurrency)))
+    elapsed = time.perf_counter() - init_time
+
+    reader, writer = await open_connection(host, port, unix_path)
+    try:
+        _, server_stats = await request(reader, writer, "GET", "/stats")
+    finally:
+        writer.close()
+
+    p50, p99 = np.percentile(latencies * 1000, [50, 99])
+    return {
+        "requests": requests,
+        "records": requests * per_request,
+        "concurrency": concurrency,
+        "errors": int(sum(errors)),
+        "elapsed_sec": elapsed,
+        "requests_per_sec": requests / elapsed,
+        "records_per_sec": requests * per_request / elapsed,
+        "latency_p50_ms": float(p50),
+        "latency_p99_ms": float(p99),
+        "server": server_stats,
+    }
+
+
+def print_load_report(result: dict):
+    server = result["server"]
+    print(f"{result['requests']} requests ({result['records']} records) over {result['concurrency']} connections "
+          f"in {result['elapsed_sec']:.2f} sec, {result['errors']} errors")
+    print(f"{'':>8} {'p50 ms':>8} {'p99 ms':>8} {'req/s':>10} {'records/s':>10}")
+    print(f"{'client':>8} {result['latency_p50_ms']:>8.2f} {result['latency_p99_ms']:>8.2f} "
+          f"{result['requests_per_sec']:>10,.0f} {result['records_per_sec']:>10,.0f}")
+    print(f"{'server':>8} {server['latency_p50_ms']:>8.2f} {server['latency_p99_ms']:>8.2f} "
+          f"{server['requests_per_sec']:>10,.0f} {server['records_per_sec']:>10,.0f}")
+    print(f"Server ran {server['batches']} batches, {server['mean_batch_size']:.1f} records per batch on average")
+    pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load generator for the inference server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--unix", help="connect to this Unix socket instead of TCP")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--per-request", type=int, default=1, help="records in every request")
+    parser.add_argument("--data", help="CSV with the records to send, random pixels are sent without it")
+    parser.add_argument("--records", type=int, default=1000, help="distinct records to cycle through")
+    args = parser.parse_args()
+
+    if args.data:
+        data = get_data_from_file(args.data, args.records)
+        if data is None:
+            raise SystemExit(f"Failed to read '{args.data}'")
+        data_pixels = data[1]
+    else:
+        data_pixels = np.random.default_rng(0).integers(0, 256, (args.records, 784))
+
+    load_result = asyncio.run(run_load_test(args.host, args.port, args.unix, data_pixels, args.requests,
+                                            args.concurrency, args.per_request))
+    print_load_report(load_result)
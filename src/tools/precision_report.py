@@ -0,0 +1,72 @@
+import argparse
+import time
+
+import numpy as np
+
+from src.core.mnist_reader import MnistReader, NetMode
+
+
+# --- Precision report
+# --- Trains the same network (same seed, same initial weights) once per dtype and compares
+# --- the test accuracy against float64.
+# --- Usage: python -m src.tools.precision_report mnist_dataset/mnist_train.csv mnist_dataset/mnist_test.csv
+
+REPORT_DTYPES = (np.float64, np.float32, np.float16)
+
+
+def run_precision_report(train_path: str, test_path: str, train_count: int = 0, test_count: int = 0,
+                         epochs: int = 1, seed: int = 0) -> list:
+    results = []
+    for dtype in REPORT_DTYPES:
+        np.random.seed(seed)
+        reader = MnistReader(dtype=dtype)
+
+        if not reader.load_dataset(train_path, train_count, 0, NetMode.TRAIN):
+            raise ValueError(f"Failed to load training dataset '{train_path}'")
+
+        init_time = time.perf_counter()
+        reader.train(epochs)
+        train_time = time.perf_counter() - init_time
+
+        if not reader.load_dataset(test_path, test_count, 0, NetMode.QUERY):
+            raise ValueError(f"Failed to load test dataset '{test_path}'")
+
+        init_time = time.perf_counter()
+        reader.query()
+        query_time = time.perf_counter() - init_time
+
+        results.append({
+            "dtype": np.dtype(dtype).name,
+            "weights_mb": sum(w.nbytes for w in reader.n.weights) / 2 ** 20,
+            "train_sec": train_time,
+            "query_sec": query_time,
+            "accuracy": reader.get_accuracy(),
+        })
+
+    baseline = results[0]["accuracy"]
+    for result in results:
+        result["accuracy_delta"] = result["accuracy"] - baseline
+
+    return results
+
+
+def print_precision_report(results: list):
+    print(f"{'dtype':<8} {'weights MB':>10} {'train s':>8} {'query s':>8} {'accuracy %':>10} {'vs float64':>10}")
+    for r in results:
+        print(f"{r['dtype']:<8} {r['weights_mb']:>10.2f} {r['train_sec']:>8.2f} {r['query_sec']:>8.3f} "
+              f"{r['accuracy']:>10.2f} {r['accuracy_delta']:>+10.2f}")
+    pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare MNIST accuracy for float64, float32 and float16 networks")
+    parser.add_argument("train_path")
+    parser.add_argument("test_path")
+    parser.add_argument("--train-count", type=int, default=0)
+    parser.add_argument("--test-count", type=int, default=0)
+    parser.add_argument("--epochs", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print_precision_report(run_precision_report(args.train_path, args.test_path, args.train_count,
+                                                args.test_count, args.epochs, args.seed))
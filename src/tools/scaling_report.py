@@ -0,0 +1,72 @@
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from src.core.mnist_reader import MnistReader, NetMode
+from src.tools.benchmark import make_synthetic_dataset, write_synthetic_csv
+
+
+# --- Scaling report
+# --- Epoch time of data-parallel training for 1..N worker processes. Starting the worker processes is
+# --- reported separately, it is paid once per run and not per epoch.
+# --- Usage: python -m src.tools.scaling_report --max-workers 8 [--path mnist_dataset/mnist_train.csv]
+# --- Without --path a synthetic MNIST-shaped dataset is used.
+
+
+def measure_epoch(path: str, records: int, workers: int, batch_size: int, hidden: int, seed: int) -> tuple[float, float]:
+    # (epoch seconds, worker startup seconds)
+    np.random.seed(seed)
+    reader = MnistReader([784, hidden, 10])
+    reader.workers = workers
+    if not reader.load_dataset(path, records, 0, NetMode.TRAIN):
+        raise ValueError(f"Failed to load training dataset '{path}'")
+
+    init_time = time.perf_counter()
+    reader.train(1, None, batch_size)
+    return time.perf_counter() - init_time - reader.startup_time, reader.startup_time
+
+
+def run_scaling_report(path: str = None, records: int = 10000, max_workers: int = None, batch_size: int = 256,
+                       hidden: int = 100, seed: int = 0) -> list:
+    max_workers = max_workers or os.cpu_count() or 1
+
+    with tempfile.TemporaryDirectory() as directory:
+        if path is None:
+            path = os.path.join(directory, "synthetic.csv")
+            write_synthetic_csv(path, *make_synthetic_dataset(records, seed))
+
+        results = []
+        for workers in range(1, max_workers + 1):
+            seconds, startup_seconds = measure_epoch(path, records, workers, batch_size, hidden, seed)
+            results.append({
+                "workers": workers,
+                "epoch_sec": seconds,
+                "startup_sec": startup_seconds,
+                "samples_per_sec": records / seconds,
+                "speedup": results[0]["epoch_sec"] / seconds if results else 1.0,
+            })
+
+    return results
+
+
+def print_scaling_report(results: list):
+    print(f"{'workers':>7} {'epoch s':>9} {'startup s':>10} {'samples/s':>11} {'speedup':>8}")
+    for r in results:
+        print(f"{r['workers']:>7} {r['epoch_sec']:>9.2f} {r['startup_sec']:>10.2f} {r['samples_per_sec']:>11.0f} "
+              f"{r['speedup']:>7.2f}x")
+    pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Epoch time of data-parallel training for 1..N workers")
+    parser.add_argument("--path", help="training CSV, a synthetic dataset is used by default")
+    parser.add_argument("--records", type=int, default=10000)
+    parser.add_argument("--max-workers", type=int)
+    parser.add_argument("--batch", type=int, default=256)
+    parser.add_argument("--hidden", type=int, default=100)
+    args = parser.parse_args()
+
+    print_scaling_report(run_scaling_report(args.path, args.records, args.max_workers, args.batch, args.hidden))
@@ -0,0 +1,193 @@
+import argparse
+import itertools
+import json
+import multiprocessing as mp
+import os
+import time
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from src.core.activations import ACTIVATION_NAMES
+from src.core.lr_schedules import LR_SCHEDULE_NAMES
+from src.core.mnist_reader import MnistReader, NetMode
+from src.utils.dataset_store import open_dataset_store
+
+
+# --- Hyperparameter sweep
+# --- Trains one network per configuration in parallel worker processes and reports test accuracy
+# --- against wall time. The CSVs are parsed once into the binary dataset store, every trial maps
+# --- the same store files, so the workers share one copy of the data through the page cache.
+# --- Usage:
+# ---   python -m src.tools.sweep mnist_dataset/mnist_train.csv mnist_dataset/mnist_test.csv \
+# ---       --hidden 50 100 200 --lr 0.05 0.1 0.2 --batch 10 --workers 4 --target 95
+# ---   random search: --random 20 --lr-range 0.01 0.5 samples 20 configurations instead of the full grid
+
+# numbers of threads of the numeric libraries in every worker, the trials already use all cores
+THREAD_ENV_VARIABLES = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+
+
+def get_grid(space: dict) -> list:
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+
+def get_random_configs(space: dict, count: int, lr_range: tuple = None, seed: int = 0) -> list:
+    # every parameter is drawn from its list, the learning rate log-uniformly from lr_range if it is given
+    rng = np.random.default_rng(seed)
+    configs = []
+    for _ in range(count):
+        config = {name: values[rng.integers(len(values))] for name, values in space.items()}
+        if lr_range is not None:
+            config["lr"] = float(np.exp(rng.uniform(np.log(lr_range[0]), np.log(lr_range[1]))))
+        configs.append(config)
+    return configs
+
+
+def run_trial(config: dict, train_path: str, test_path: str, train_count: int, test_count: int, seed: int) -> dict:
+    np.random.seed(seed)
+    layers = [784, *config["hidden"], 10]
+    activations = [config["activation"]] * (len(layers) - 2) + [config["output"]]
+    reader = MnistReader(layers, activations, np.dtype(config["dtype"]))
+    reader.n.lr = config["lr"]
+    reader.lr_schedule = config["schedule"]
+
+    if not reader.load_dataset(train_path, train_count, 0, NetMode.TRAIN):
+        raise ValueError(f"Failed to load training dataset '{train_path}'")
+
+    init_time = time.perf_counter()
+    reader.train(config["epochs"], None, config["batch"])
+    train_time = time.perf_counter() - init_time
+
+    if not reader.load_dataset(test_path, test_count, 0, NetMode.QUERY):
+        raise ValueError(f"Failed to load test dataset '{test_path}'")
+
+    init_time = time.perf_counter()
+    reader.query()
+    query_time = time.perf_counter() - init_time
+
+    return {
+        "config": config,
+        "parameters": int(sum(w.size for w in reader.n.weights)),
+        "epochs_run": reader.metrics.epoch_count,
+        "train_sec": train_time,
+        "query_sec": query_time,
+        "accuracy": reader.get_accuracy(),
+    }
+
+
+def run_sweep(configs: list, train_path: str, test_path: str, train_count: int = 0, test_count: int = 0,
+              workers: int = None, seed: int = 0) -> list:
+    workers = workers or os.cpu_count() or 1
+
+    # parse the CSVs into the binary store once, before the workers map it
+    open_dataset_store(train_path)
+    open_dataset_store(test_path)
+
+    saved_env = {name: os.environ.get(name) for name in THREAD_ENV_VARIABLES}
+    for name in THREAD_ENV_VARIABLES:
+        os.environ[name] = "1"
+
+    results = []
+    init_time = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn")) as executor:
+            futures = {
+                executor.submit(run_trial, config, train_path, test_path, train_count, test_count, seed): config
+                for config in configs
+            }
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"Trial {futures[future]} failed: {e}")
+                    continue
+
+                results.append(result)
+                print(f"[{len(results)}/{len(configs)}] {format_config(result['config'])}: "
+                      f"{result['accuracy']:.2f}% in {result['train_sec']:.1f} sec")
+    finally:
+        for name, value in saved_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+    print(f"Sweep of {len(configs)} trials on {workers} workers took {time.perf_counter() - init_time:.1f} sec")
+    return sorted(results, key=lambda r: r["train_sec"])
+
+
+def format_config(config: dict) -> str:
+    hidden = "-".join(str(size) for size in config["hidden"])
+    return (f"hidden {hidden} {config['activation']}/{config['output']} lr {config['lr']:.3g} "
+            f"{config['schedule']} batch {config['batch']} epochs {config['epochs']} {config['dtype']}")
+
+
+def get_cheapest(results: list, target: float):
+    # the fastest configuration to train that reaches the target accuracy
+    passed = [r for r in results if r["accuracy"] >= target]
+    return min(passed, key=lambda r: r["train_sec"]) if passed else None
+
+
+def print_sweep_report(results: list, target: float = None):
+    print(f"{'accuracy %':>10} {'train s':>8} {'query s':>8} {'params':>9} {'epochs':>6}  configuration")
+    for r in results:
+        print(f"{r['accuracy']:>10.2f} {r['train_sec']:>8.2f} {r['query_sec']:>8.3f} {r['parameters']:>9} "
+              f"{r['epochs_run']:>6}  {format_config(r['config'])}")
+
+    if target is not None:
+        cheapest = get_cheapest(results, target)
+        if cheapest is None:
+            print(f"\nNo configuration reached {target:.2f}%")
+        else:
+            print(f"\nCheapest configuration with at least {target:.2f}%: {format_config(cheapest['config'])} "
+                  f"({cheapest['accuracy']:.2f}% in {cheapest['train_sec']:.1f} sec)")
+    pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hyperparameter sweep, trials run in parallel worker processes")
+    parser.add_argument("train_path")
+    parser.add_argument("test_path")
+    parser.add_argument("--train-count", type=int, default=0)
+    parser.add_argument("--test-count", type=int, default=0)
+    parser.add_argument("--hidden", nargs="+", default=["100"],
+                        help="hidden layer sizes per option, '200-100' is a network with two hidden layers")
+    parser.add_argument("--lr", type=float, nargs="+", default=[0.2])
+    parser.add_argument("--lr-range", type=float, nargs=2, help="log-uniform learning rate range for --random")
+    parser.add_argument("--schedule", nargs="+", choices=LR_SCHEDULE_NAMES, default=["cosine"])
+    parser.add_argument("--activation", nargs="+", choices=ACTIVATION_NAMES, default=["sigmoid"])
+    parser.add_argument("--output-activation", nargs="+", choices=ACTIVATION_NAMES, default=["sigmoid"])
+    parser.add_argument("--batch", type=int, nargs="+", default=[10])
+    parser.add_argument("--epochs", type=int, nargs="+", default=[1])
+    parser.add_argument("--dtype", nargs="+", choices=["float64", "float32", "float16"], default=["float32"])
+    parser.add_argument("--random", type=int, help="sample this many configurations instead of the full grid")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--target", type=float, help="accuracy bar in percent for picking the cheapest model")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    search_space = {
+        "hidden": [[int(size) for size in option.split("-")] for option in args.hidden],
+        "activation": args.activation,
+        "output": args.output_activation,
+        "lr": args.lr,
+        "schedule": args.schedule,
+        "batch": args.batch,
+        "epochs": args.epochs,
+        "dtype": args.dtype,
+    }
+    if args.random:
+        sweep_configs = get_random_configs(search_space, args.random, args.lr_range, args.seed)
+    else:
+        sweep_configs = get_grid(search_space)
+
+    sweep_results = run_sweep(sweep_configs, args.train_path, args.test_path, args.train_count, args.test_count,
+                              args.workers, args.seed)
+    print_sweep_report(sweep_results, args.target)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(sweep_results, file, indent=2)
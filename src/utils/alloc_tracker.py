@@ -0,0 +1,55 @@
+import tracemalloc
+
+
+class AllocationTracker:
+
+    # per-step peak and leftover memory from tracemalloc, near zero while the workspaces are reused
+    def __init__(self, min_bytes: int = 1024):
+        # steps whose peak is below min_bytes (scalars, small Python objects) are not counted
+        self.min_bytes = min_bytes
+        self.steps = 0
+        self.allocating_steps = 0
+        self.peak_bytes = []
+        self.retained_bytes = []
+        self.started_tracing = False
+        self.baseline = 0
+
+    def begin(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+
+        tracemalloc.reset_peak()
+        self.baseline = tracemalloc.get_traced_memory()[0]
+        pass
+
+    def end(self):
+        current, peak = tracemalloc.get_traced_memory()
+        self.steps += 1
+        self.peak_bytes.append(peak - self.baseline)
+        self.retained_bytes.append(current - self.baseline)
+        if peak - self.baseline >= self.min_bytes:
+            self.allocating_steps += 1
+        pass
+
+    def stop(self):
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+        pass
+
+    def get_summary(self) -> dict:
+        steps = max(self.steps, 1)
+        return {
+            "steps": self.steps,
+            "allocating_steps": self.allocating_steps,
+            "max_peak_bytes": max(self.peak_bytes, default=0),
+            "mean_peak_bytes": sum(self.peak_bytes) / steps,
+            "retained_bytes": sum(self.retained_bytes),
+        }
+
+    def report(self) -> str:
+        summary = self.get_summary()
+        return (f"Steps: {summary['steps']}, steps with temporaries >= {self.min_bytes} B: {summary['allocating_steps']}\n"
+                f"Temporary memory per step: max {summary['max_peak_bytes']} B, mean {summary['mean_peak_bytes']:.0f} B\n"
+                f"Memory retained by all steps: {summary['retained_bytes']} B")
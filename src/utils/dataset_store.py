@@ -0,0 +1,137 @@
+import hashlib
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from src.utils.mnist_csv import iter_csv_chunks, read_mnist_csv
+
+
+# --- Binary dataset store
+# --- A parsed CSV is kept next to the source as one file: a fixed header, the uint8 pixel matrix
+# --- (count x width) and the uint8 label vector. Both arrays are opened as np.memmap views,
+# --- so slicing by count / start_pos is an O(1) offset and nothing is read until it is used.
+# --- When the dataset folder is read-only the store goes to the user cache directory, and when
+# --- that is not writable either the dataset is parsed into memory on every load.
+
+STORE_MAGIC = b"MNISTU8\x01"
+STORE_HEADER = np.dtype([
+    ("magic", "S8"),
+    ("count", "<i8"),
+    ("width", "<i8"),
+    ("source_size", "<i8"),
+    ("source_mtime", "<i8"),
+    ("source_hash", "S16"),
+])
+STORE_HEADER_SIZE = 64
+STORE_CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+                               "mnist_nn")
+
+
+def get_store_path(path: str) -> str:
+    return path + ".u8store"
+
+
+def get_store_paths(path: str) -> list:
+    # next to the CSV first, then in the user cache directory under a name unique to the absolute path
+    cache_name = f"{os.path.basename(path)}.{hashlib.md5(os.path.abspath(path).encode()).hexdigest()[:12]}.u8store"
+    return [get_store_path(path), os.path.join(STORE_CACHE_DIR, cache_name)]
+
+
+def get_source_header(path: str) -> np.ndarray:
+    stat = os.stat(path)
+    header = np.zeros((), dtype=STORE_HEADER)
+    header["magic"] = STORE_MAGIC
+    header["source_size"] = stat.st_size
+    header["source_mtime"] = stat.st_mtime_ns
+    header["source_hash"] = hashlib.md5(os.path.abspath(path).encode()).digest()
+    return header
+
+
+def read_store_header(store_path: str):
+    try:
+        with open(store_path, "rb") as file:
+            raw = file.read(STORE_HEADER.itemsize)
+    except OSError:
+        return None
+
+    if len(raw) != STORE_HEADER.itemsize:
+        return None
+    return np.frombuffer(raw, dtype=STORE_HEADER)[0]
+
+
+def is_store_valid(store_header, source_header: np.ndarray) -> bool:
+    if store_header is None:
+        return False
+
+    return all(store_header[key] == source_header[key]
+               for key in ("magic", "source_size", "source_mtime", "source_hash"))
+
+
+def build_dataset_store(path: str, store_path: str, source_header: np.ndarray):
+    # the CSV is parsed chunk by chunk straight into the store, so memory stays bounded by the chunk size,
+    # the parser checks that every row has the width of the first one
+    init_time = time.perf_counter()
+    header = source_header.copy()
+    labels = []
+
+    # a unique temporary file, so processes building the same store (GUI, CLI, sweep trials) do not collide
+    directory, name = os.path.split(store_path)
+    os.makedirs(directory or ".", exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=name + ".", suffix=".tmp", dir=directory or ".")
+    try:
+        with os.fdopen(fd, "wb") as store:
+            store.write(bytes(STORE_HEADER_SIZE))
+            for chunk_labels, chunk_pixels in iter_csv_chunks(path):
+                header["width"] = chunk_pixels.shape[1]
+                store.write(chunk_pixels.tobytes())
+                labels.append(chunk_labels)
+                header["count"] += len(chunk_labels)
+
+            if labels:
+                store.write(np.concatenate(labels).tobytes())
+
+            store.seek(0)
+            store.write(header.tobytes())
+
+        os.replace(tmp_path, store_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+    print(f"Parsed {header['count']} records from {path} in {time.perf_counter() - init_time:.2f} sec")
+
+
+def open_dataset_store(path: str) -> tuple[np.ndarray, np.ndarray]:
+    # returns (labels, pixels) as read-only memmap views, building the store on the first load
+    source_header = get_source_header(path)
+    store_paths = get_store_paths(path)
+
+    for store_path in store_paths:
+        header = read_store_header(store_path)
+        if is_store_valid(header, source_header):
+            return map_dataset_store(store_path, header)
+
+    for store_path in store_paths:
+        try:
+            build_dataset_store(path, store_path, source_header)
+        except OSError as e:
+            print(f"Cannot write the dataset store '{store_path}': {e}")
+            continue
+        return map_dataset_store(store_path, read_store_header(store_path))
+
+    # nowhere to keep the parsed dataset, the CSV is parsed into memory
+    labels, pixels = read_mnist_csv(path)
+    labels.flags.writeable = pixels.flags.writeable = False
+    return labels, pixels
+
+
+def map_dataset_store(store_path: str, header) -> tuple[np.ndarray, np.ndarray]:
+    count, width = int(header["count"]), int(header["width"])
+    if count == 0:
+        return np.empty(0, dtype=np.uint8), np.empty((0, width), dtype=np.uint8)
+
+    pixels = np.memmap(store_path, dtype=np.uint8, mode="r", offset=STORE_HEADER_SIZE, shape=(count, width))
+    labels = np.memmap(store_path, dtype=np.uint8, mode="r", offset=STORE_HEADER_SIZE + count * width, shape=(count,))
+    return labels, pixels
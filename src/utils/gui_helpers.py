@@ -1,6 +1,6 @@
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont
-from PyQt6.QtWidgets import QWidget, QLayout, QProgressBar
+from PyQt6.QtWidgets import QWidget, QLayout, QProgressBar, QCheckBox
 
 
 # --- Constants for the GUI
@@ -11,6 +11,11 @@ SIZE_FONT_H3 = 18
 SIZE_FONT_PROGRESS = 10
 SIZE_FONT_ACCURACY = 54
 IMAGE_WITH_DIGIT_SIZE = 336
+WINDOW_WIDTH = 960
+WINDOW_MIN_HEIGHT = 540
+
+# long training runs write their periodic checkpoints next to the model file, never over it
+AUTOSAVE_SUFFIX = ".autosave"
 
 
 def set_progress_bar_style(element: QProgressBar, font_size: int, height: int = 0, alignment: Qt.AlignmentFlag = Qt.AlignmentFlag.AlignCenter):
@@ -40,6 +45,11 @@ def set_widget_style(element: QWidget, font_size: int, height: int = 0, alignmen
     element.setStyleSheet("color: #ffffff")
     pass
 
+def set_checkbox_style(element: QCheckBox, font_size: int):
+    element.setFont(QFont("TT Supermolot Neue Trl Db", font_size, QFont.Weight.Bold))
+    element.setStyleSheet("color: #ffffff")
+    pass
+
 def set_layout_visible(layout: QLayout, visible: bool):
     for i in range(layout.count()):
         widget = layout.itemAt(i).widget()
@@ -0,0 +1,147 @@
+import numpy as np
+
+
+# --- MNIST CSV parser
+# --- Parses "label,pixel,...,pixel" rows of integers 0..255 straight from bytes: the file is read in large
+# --- binary chunks cut at line ends, every field is located from the separator positions and its value is
+# --- gathered from its last three digits, so there are no per-row Python objects or float conversions.
+# --- Skipped rows (start_pos) are only counted, never parsed, and all row widths are checked at once.
+
+CSV_CHUNK_BYTES = 8 * 2 ** 20
+
+COMMA = ord(",")
+NEWLINE = ord("\n")
+CARRIAGE_RETURN = ord("\r")
+ZERO = ord("0")
+BLANK = b" \t\r\n"
+
+
+def parse_csv_bytes(data, width: int = None, first_row: int = 0) -> np.ndarray:
+    # complete lines (the last one may lack its newline) -> uint8 matrix (rows, width), label in column 0,
+    # width counts the label too; first_row is only used to number the rows in error messages
+    # trailing blank lines, which exported CSVs often have, are not records; the newline after the last
+    # record is kept when it is there, so the buffer stays a view of the data
+    size = len(data)
+    while size and data[size - 1] in BLANK:
+        size -= 1
+    if 0 < size < len(data) and data[size] == NEWLINE:
+        size += 1
+    buffer = np.frombuffer(data, dtype=np.uint8, count=size)
+    if CARRIAGE_RETURN in buffer:
+        buffer = buffer[buffer != CARRIAGE_RETURN]
+    if len(buffer) == 0:
+        return np.empty((0, width or 0), dtype=np.uint8)
+    if buffer[-1] != NEWLINE:
+        buffer = np.append(buffer, np.uint8(NEWLINE))
+
+    # every field ends at a separator, a newline also ends its row
+    digits = buffer - np.uint8(ZERO)
+    is_separator = (buffer == COMMA) | (buffer == NEWLINE)
+    is_valid = is_separator | (digits < 10)
+    if not is_valid.all():
+        position = int(np.argmin(is_valid))
+        row = first_row + int(np.count_nonzero(buffer[:position] == NEWLINE))
+        raise ValueError(f"Unexpected character {chr(buffer[position])!r} in row {row}")
+
+    ends = np.flatnonzero(is_separator)
+    lengths = np.diff(ends, prepend=-1) - 1
+    if lengths.min() < 1 or lengths.max() > 3:
+        field = int(np.flatnonzero((lengths < 1) | (lengths > 3))[0])
+        row = first_row + int(np.count_nonzero(buffer[ends[:field]] == NEWLINE))
+        raise ValueError(f"Empty value or a value of more than 3 digits in row {row}")
+
+    # units, tens and hundreds of every field, the digits before a short field belong to the previous one
+    values = digits[ends - 1].astype(np.uint16)
+    values += np.where(lengths >= 2, digits[np.maximum(ends - 2, 0)], 0).astype(np.uint16) * 10
+    values += np.where(lengths >= 3, digits[np.maximum(ends - 3, 0)], 0).astype(np.uint16) * 100
+    if values.max() > 255:
+        field = int(np.argmax(values > 255))
+        row = first_row + int(np.count_nonzero(buffer[ends[:field]] == NEWLINE))
+        raise ValueError(f"Value {values[field]} in row {row} is out of the 0..255 range")
+
+    # fields per row, checked in bulk
+    row_ends = np.flatnonzero(buffer[ends] == NEWLINE)
+    widths = np.diff(row_ends, prepend=-1)
+    width = width or int(widths[0])
+    if np.any(widths != width):
+        row = int(np.argmax(widths != width))
+        raise ValueError(f"Expected {width} values per record, got {widths[row]} in row {first_row + row}")
+
+    return values.astype(np.uint8).reshape(len(row_ends), width)
+
+
+def get_line_ends(data: bytes) -> np.ndarray:
+    # offsets of the line ends, an unterminated last line ends at the end of the data
+    line_ends = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == NEWLINE)
+    if data and not data.endswith(b"\n"):
+        line_ends = np.append(line_ends, len(data) - 1)
+    return line_ends
+
+
+def is_header_bytes(line: bytes) -> bool:
+    return not line.split(b",", 1)[0].strip().isdigit()
+
+
+def iter_csv_chunks(path: str, count: int = 0, start_pos: int = 0, width: int = None,
+                    chunk_bytes: int = CSV_CHUNK_BYTES):
+    # yields (labels, pixels) uint8 chunks of up to ~chunk_bytes of text, reading `count` rows (0 = all)
+    # from row `start_pos`, the column header row some MNIST exports have is skipped
+    remaining = count if count else None
+    skip = start_pos
+    row = start_pos
+    tail = b""
+    first = True
+
+    with open(path, "rb") as file:
+        while remaining is None or remaining > 0:
+            block = file.read(chunk_bytes)
+            data = tail + block
+            if not data:
+                break
+
+            if first:
+                first = False
+                line_end = data.find(b"\n")
+                if is_header_bytes(data[:line_end if line_end >= 0 else len(data)]):
+                    data = data[line_end + 1:] if line_end >= 0 else b""
+
+            # only complete lines are parsed, the rest waits for the next block (or is the unterminated last line)
+            cut = data.rfind(b"\n") + 1 if block else len(data)
+            data, tail = data[:cut], data[cut:]
+
+            # rows before start_pos are counted, not parsed, and the chunk is cut after `remaining` rows
+            if skip > 0 or remaining is not None:
+                line_ends = get_line_ends(data)
+                first_line = min(skip, len(line_ends))
+                skip -= first_line
+                start = int(line_ends[first_line - 1]) + 1 if first_line else 0
+                stop = len(data)
+                if remaining is not None and len(line_ends) - first_line > remaining:
+                    stop = int(line_ends[first_line + remaining - 1]) + 1
+                data = data[start:stop]
+
+            records = parse_csv_bytes(data, width, row) if data else None
+            if records is not None and len(records):
+                width = records.shape[1]
+                row += len(records)
+                if remaining is not None:
+                    remaining -= len(records)
+                yield records[:, 0].copy(), records[:, 1:]
+
+            if not block:
+                break
+    pass
+
+
+def get_text_size(labels: np.ndarray, pixels: np.ndarray) -> int:
+    # bytes the records take as CSV text: the digits of every value plus a separator after each of them
+    values = (labels, pixels)
+    digits = sum(v.size + np.count_nonzero(v >= 10) + np.count_nonzero(v >= 100) for v in values)
+    return int(digits + labels.size + pixels.size)
+
+
+def read_mnist_csv(path: str, count: int = 0, start_pos: int = 0, width: int = None) -> tuple[np.ndarray, np.ndarray]:
+    chunks = list(iter_csv_chunks(path, count, start_pos, width))
+    if not chunks:
+        return np.empty(0, dtype=np.uint8), np.empty((0, (width or 1) - 1), dtype=np.uint8)
+    return np.concatenate([c[0] for c in chunks]), np.concatenate([c[1] for c in chunks])
@@ -0,0 +1,106 @@
+import json
+import os
+import threading
+import time
+
+
+# log2 histogram buckets of span durations in microseconds, the last one takes everything above ~36 minutes
+HISTOGRAM_BUCKETS = 32
+
+# spans kept for the Chrome trace, later ones are only counted in the totals
+TRACE_CAPACITY = 200000
+
+
+class Profiler:
+
+    # instrumented code holds a `profiler` attribute that is None by default, so a disabled one costs a check per span:
+    #     start = profiler.begin() if profiler is not None else 0.0
+    #     profiler.end("forward", start) if profiler is not None else None
+    # with trace=True the single spans are also kept for a Chrome trace (ui.perfetto.dev)
+    def __init__(self, trace: bool = False, trace_capacity: int = TRACE_CAPACITY):
+        self.trace = trace
+        self.trace_capacity = trace_capacity
+        self.reset()
+
+    def reset(self):
+        # name -> [count, total sec, max sec, histogram]
+        self.spans = {}
+        self.events = []
+        self.dropped_events = 0
+        self.start_time = time.perf_counter()
+        pass
+
+    @staticmethod
+    def begin() -> float:
+        return time.perf_counter()
+
+    def end(self, name: str, start: float):
+        end = time.perf_counter()
+        duration = end - start
+
+        stats = self.spans.get(name)
+        if stats is None:
+            stats = self.spans[name] = [0, 0.0, 0.0, [0] * HISTOGRAM_BUCKETS]
+        stats[0] += 1
+        stats[1] += duration
+        if duration > stats[2]:
+            stats[2] = duration
+        stats[3][min(int(duration * 1e6).bit_length(), HISTOGRAM_BUCKETS - 1)] += 1
+
+        if self.trace:
+            if len(self.events) < self.trace_capacity:
+                self.events.append((name, start, duration, threading.get_ident()))
+            else:
+                self.dropped_events += 1
+        pass
+
+    @staticmethod
+    def get_percentile(histogram: list, count: int, fraction: float) -> float:
+        # upper bound of the bucket that holds the percentile, in seconds
+        rank = fraction * count
+        seen = 0
+        for bucket, bucket_count in enumerate(histogram):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                return (1 << bucket) / 1e6
+        return 0.0
+
+    def get_summary(self) -> dict:
+        # spans sorted by total time, shares are of the wall time since reset(); nested spans are counted in both
+        wall_time = time.perf_counter() - self.start_time
+        summary = {}
+        for name, (count, total, maximum, histogram) in sorted(self.spans.items(), key=lambda item: -item[1][1]):
+            summary[name] = {
+                "count": count,
+                "total_sec": total,
+                "share": total / wall_time if wall_time > 0 else 0.0,
+                "mean_us": total / count * 1e6,
+                "p50_us": min(self.get_percentile(histogram, count, 0.5), maximum) * 1e6,
+                "p99_us": min(self.get_percentile(histogram, count, 0.99), maximum) * 1e6,
+                "max_us": maximum * 1e6,
+                "histogram": histogram,
+            }
+        return summary
+
+    def report(self) -> str:
+        # p50 / p99 are bucket bounds (powers of two) capped by the max, which is exact
+        lines = [f"{'span':<14} {'count':>8} {'total ms':>10} {'wall %':>7} {'mean us':>9} "
+                 f"{'p50 us':>8} {'p99 us':>8} {'max us':>9}"]
+        for name, span in self.get_summary().items():
+            lines.append(f"{name:<14} {span['count']:>8} {span['total_sec'] * 1000:>10.1f} {span['share'] * 100:>7.1f} "
+                         f"{span['mean_us']:>9.1f} {span['p50_us']:>8.0f} {span['p99_us']:>8.0f} {span['max_us']:>9.0f}")
+        if self.dropped_events:
+            lines.append(f"{self.dropped_events} spans were not kept for the trace")
+        return "\n".join(lines)
+
+    def export_chrome_trace(self, path: str):
+        # complete ("X") events in microseconds since reset(), one row per thread
+        pid = os.getpid()
+        events = [
+            {"name": name, "ph": "X", "ts": (start - self.start_time) * 1e6, "dur": duration * 1e6,
+             "pid": pid, "tid": tid}
+            for name, start, duration, tid in self.events
+        ]
+        with open(path, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+        pass
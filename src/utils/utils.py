@@ -1,4 +1,4 @@
-from itertools import islice
+from src.utils.dataset_store import open_dataset_store
 
 
 # --- Message constants
@@ -7,20 +7,24 @@ MSG_EMPTY_IMAGE_ARRAY = "Image array is empty or not loaded."
 MSG_DATASET_IS_NOT_LOADED = "Failed to load dataset. Check the selected file exists and is not empty."
 MSG_TRAINING_COMPLETED = "The neural network has been trained on {} records.\nNow please select test dataset."
 MSG_UNKNOWN_NET_MODE = "Unknown net mode. Please select TRAIN or QUERY mode."
+MSG_MODEL_IS_NOT_SAVED = "Failed to save the model. Check the selected location is writable."
+MSG_MODEL_IS_NOT_LOADED = "Failed to load the model. Check the selected file is a saved model."
+MSG_METRICS_ARE_NOT_EXPORTED = "Failed to export the training metrics. Check the selected location is writable."
+MSG_JOB_FAILED = "{} has failed:\n{}"
+MSG_MODEL_LOADED = "The model has been loaded.\nIt was trained on {} records.\nNow please select test dataset."
 MSG_QUERY_COMPLETED = "{} records from dataset have been processed.\nAccuracy - {:.2f}%\nNow you can select a record to view its image and processed data."
 
 # --- Utility functions
 
 def get_data_from_file(path: str, count: int = 0, start_pos: int = 0):
+    # returns (labels, pixels) as uint8 memmap views over the binary store, slicing costs nothing
     try:
-        with open(path, "r") as file:
-            if count is None or count == 0:
-                lines = list(islice(file, start_pos, None))
-            else:
-                lines = list(islice(file, start_pos, start_pos + count))
+        labels, pixels = open_dataset_store(path)
+        stop = None if count is None or count == 0 else start_pos + count
+        labels, pixels = labels[start_pos:stop], pixels[start_pos:stop]
 
-            print(f"Read {len(lines)} lines from {path}")
-            return lines
+        print(f"Read {len(labels)} records from {path}")
+        return labels, pixels
 
     except FileNotFoundError:
         print(f"Error: File '{path}' not found.")
@@ -31,4 +35,5 @@ def get_data_from_file(path: str, count: int = 0, start_pos: int = 0):
     except Exception as e:
         print(f"Unexpected error: {e}")
 
-    return []
\ No newline at end of file
+    return None
+